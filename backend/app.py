@@ -1,38 +1,103 @@
+import time
+_boot_started = time.perf_counter()
+
+import atexit
+import csv
+import hashlib
+import io
+import json
+import logging
 import os
-from flask import Flask, request, jsonify, send_from_directory, send_file
+import queue
+from flask import Flask, Response, g, request, jsonify, send_file
 from flask_cors import CORS
 import sys
+import threading
 import traceback
 from datetime import datetime
-import pandas as pd
 
 # Add parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import custom utilities
-from utils.model_loader import LSTMModelLoader
+from utils.model_loader import LSTMModelLoader, load_model_config
+from utils.model_registry import ModelRegistry
+from utils.inference_engines import configure_threads
 from utils.data_processor import DataProcessor
+from utils.storage import SQLiteStorage
+from utils.exporter import EXPORT_FORMATS, stream_export
+from utils.bulk_import import IMPORT_FORMATS, bulk_import
+from utils.persistence import PersistenceWriter
+from utils.offload import BoundedExecutor, OverloadedError
+from utils.metrics import REGISTRY, RateLimitedLogger, end_trace, start_trace
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, 'models', 'model_weights.pth')
-DATA_PATH = os.path.join(BASE_DIR, 'data', 'Modeldata.xlsx')
+MODEL_PATH = os.path.join(BASE_DIR, 'Models', 'model_weights.pth')
+MODEL_CONFIG_PATH = os.path.join(BASE_DIR, 'Models', 'config.json')
+MODEL_ARTIFACT_PATH = os.path.join(BASE_DIR, 'Models', 'model_artifact.pt')
+MODELS_DIR = os.path.join(BASE_DIR, 'Models')
+DATA_PATH = os.environ.get('HISTORY_EXCEL_PATH', os.path.join(BASE_DIR, 'data', 'Modeldata.xlsx'))
+DB_PATH = os.environ.get('HISTORY_DB_PATH', os.path.join(BASE_DIR, 'data', 'history.db'))
+
+# Fast boot: muat artifact siap pakai jika ada (buat dengan: python manage.py build-artifact)
+FAST_BOOT = os.environ.get('FAST_BOOT', '1') != '0'
+
+# Micro-batching inference (0 = nonaktif)
+INFERENCE_MAX_BATCH = int(os.environ.get('INFERENCE_MAX_BATCH', 32))
+INFERENCE_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MAX_WAIT_MS', 3.0))
+
+# Cache hasil prediksi (0 = nonaktif)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+
+# Pool terbatas untuk pekerjaan berat (model, pandas)
+OFFLOAD_WORKERS = int(os.environ.get('OFFLOAD_WORKERS', 32))
+OFFLOAD_MAX_PENDING = int(os.environ.get('OFFLOAD_MAX_PENDING', 256))
+
+# Kapasitas antrian penulisan data ke storage
+PERSIST_QUEUE_SIZE = int(os.environ.get('PERSIST_QUEUE_SIZE', 10000))
+# Batas tunggu (detik) writer saat storage macet sebelum request dijawab 503
+PERSIST_FLUSH_TIMEOUT = float(os.environ.get('PERSIST_FLUSH_TIMEOUT', 5))
+
+# Batas jumlah skenario per request /predict/batch
+PREDICT_BATCH_MAX_SCENARIOS = int(os.environ.get('PREDICT_BATCH_MAX_SCENARIOS', 10000))
+# Kolom wajib setiap skenario /predict/batch (JSON maupun CSV)
+BATCH_COLUMNS = ('ternak_besar', 'ternak_kecil')
+
+# Horizon maksimum /predict dalam hari pasar Selasa/Kamis (26 = satu kuartal, 104 = satu tahun)
+PREDICT_MAX_HORIZON = int(os.environ.get('PREDICT_MAX_HORIZON', 104))
+
+# Jumlah sampel maksimum untuk uncertainty (MC dropout) di /predict
+PREDICT_MAX_MC_SAMPLES = int(os.environ.get('PREDICT_MAX_MC_SAMPLES', 1000))
+
+# Interval cek versi model aktif untuk hot-swap setelah training (detik, 0 = nonaktif)
+MODEL_RELOAD_INTERVAL = float(os.environ.get('MODEL_RELOAD_INTERVAL', 5))
+
+# Jumlah baris per potongan saat streaming /export_data
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 5000))
+
+# Baris per potongan insert saat bulk import (satu baris progres per potongan)
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+
+# Thread request per proses worker (diisi serve.py/asgi.py: --threads gthread atau ASGI_THREADS)
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 8))
+
+# Server-sent events /stream: batas koneksi per proses dan interval keepalive (detik).
+# Setiap klien menahan satu thread request, jadi default separuh WORKER_THREADS
+# agar /predict dan route lain tetap mendapat thread.
+STREAM_MAX_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', max(1, WORKER_THREADS // 2)))
+STREAM_KEEPALIVE_SECONDS = float(os.environ.get('STREAM_KEEPALIVE_SECONDS', 15))
+
+# Log terstruktur per request (baris per detik dan burst, 0 = tanpa batas)
+REQUEST_LOG_RATE = float(os.environ.get('REQUEST_LOG_RATE', 10))
+REQUEST_LOG_BURST = int(os.environ.get('REQUEST_LOG_BURST', 20))
 
 # Pastikan folder data ada
 data_dir = os.path.join(BASE_DIR, 'data')
 if not os.path.exists(data_dir):
     os.makedirs(data_dir, exist_ok=True)
 
-# Buat file Excel kosong jika belum ada
-if not os.path.exists(DATA_PATH):
-    df = pd.DataFrame(columns=[
-        'Tanggal',
-        'Ternak Besar Masuk',
-        'Ternak Kecil Masuk',
-        'Total Pendapatan'
-    ])
-    df.to_excel(DATA_PATH, index=False)
-
 # Initialize Flask app
 app = Flask(__name__, 
     static_folder='../frontend/static',  # Lokasi folder static
@@ -42,21 +107,191 @@ CORS(app)  # Enable CORS for all routes
 
 # Initialize model and data processor
 try:
-    model_loader = LSTMModelLoader(MODEL_PATH)
-    data_processor = DataProcessor(DATA_PATH)
+    model_config = load_model_config(MODEL_CONFIG_PATH)
+    num_threads = int(os.environ.get('TORCH_NUM_THREADS', model_config.get('num_threads') or 0))
+    configure_threads(
+        num_threads,
+        int(os.environ.get('TORCH_INTEROP_THREADS', model_config.get('num_interop_threads') or 0))
+    )
+    engine = os.environ.get('INFERENCE_ENGINE', model_config.get('engine', 'eager'))
+    # Versi hasil training (python manage.py train); None = bobot bawaan
+    model_registry = ModelRegistry(MODELS_DIR)
+    model_version = model_registry.current()
+    model_loader = None
+    if FAST_BOOT and os.path.exists(MODEL_ARTIFACT_PATH):
+        model_loader = LSTMModelLoader.from_artifact(MODEL_ARTIFACT_PATH, engine=engine, num_threads=num_threads)
+        if model_version is not None and model_loader.model_version != model_version:
+            # Artifact dibuat dari versi lain; jalankan build-artifact lagi setelah training
+            print(f"Artifact versi {model_loader.model_version} usang, memuat versi {model_version}")
+            model_loader = None
+    if model_loader is None and model_version is not None:
+        model_loader = LSTMModelLoader.from_version(model_registry, model_version, engine=engine,
+                                                    num_threads=num_threads)
+    if model_loader is None:
+        model_loader = LSTMModelLoader(
+            MODEL_PATH,
+            input_size=model_config['input_size'],
+            hidden_size=model_config['hidden_size'],
+            num_layers=model_config['num_layers'],
+            output_size=model_config['output_size'],
+            dropout_rate=model_config['dropout_rate'],
+            window_size=model_config['window_size'],
+            engine=engine,
+            num_threads=num_threads
+        )
+    if INFERENCE_MAX_BATCH > 0:
+        model_loader.enable_batching(INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS)
+    if PREDICTION_CACHE_SIZE > 0:
+        model_loader.enable_cache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+    storage = SQLiteStorage(DB_PATH)
+    # Import satu kali data lama dari Excel ke SQLite
+    storage.import_excel(DATA_PATH)
+    # Satu penulis latar belakang: /predict tidak menunggu disk I/O
+    persistence_writer = PersistenceWriter(storage, max_queue_size=PERSIST_QUEUE_SIZE)
+    atexit.register(persistence_writer.close)
+    data_processor = DataProcessor(
+        DATA_PATH,
+        storage=storage,
+        window_size=model_config['window_size'],
+        writer=persistence_writer,
+        flush_timeout=PERSIST_FLUSH_TIMEOUT
+    )
     
     # Validasi inisialisasi
     if data_processor.df is None or data_processor.df.empty:
         print("Peringatan: Dataset kosong atau belum diinisialisasi dengan benar")
     
-    # Setelah inisialisasi data_processor
-    data_processor.clean_existing_data()
+    # Pembersihan data dijalankan offline: python manage.py clean-data
+    
+    offload = BoundedExecutor(OFFLOAD_WORKERS, OFFLOAD_MAX_PENDING)
+    print(f"Startup selesai dalam {time.perf_counter() - _boot_started:.2f} detik")
     
 except Exception as e:
     print(f"Error inisialisasi: {e}")
     traceback.print_exc()
     sys.exit(1)
 
+# Metrik Prometheus (/metrics); per proses, setiap worker gunicorn di-scrape sendiri
+HTTP_REQUESTS = REGISTRY.counter('lstm_http_requests_total', 'Jumlah request HTTP',
+                                 ['endpoint', 'method', 'status'])
+HTTP_LATENCY = REGISTRY.histogram('lstm_http_request_duration_seconds', 'Latency request HTTP (sampai header)',
+                                  ['endpoint', 'method'])
+REGISTRY.gauge('lstm_model_info', 'Versi model yang dilayani',
+               lambda: {(model_loader.model_version,): 1}, ['version'])
+REGISTRY.gauge('lstm_scheduler_queue_depth', 'Request yang menunggu di antrian micro-batching',
+               lambda: model_loader.scheduler.stats()['queue_depth'] if model_loader.scheduler is not None else None)
+REGISTRY.gauge('lstm_prediction_cache_entries', 'Jumlah entri cache prediksi',
+               lambda: model_loader.cache.stats()['entries'] if model_loader.cache is not None else None)
+REGISTRY.gauge('lstm_prediction_cache_lookups_total', 'Lookup cache prediksi',
+               lambda: {('hit',): model_loader.cache.hits, ('miss',): model_loader.cache.misses}
+               if model_loader.cache is not None else None,
+               ['result'], metric_type='counter')
+REGISTRY.gauge('lstm_persistence_queue_depth', 'Baris yang menunggu ditulis ke storage',
+               lambda: persistence_writer.stats()['queue_depth'])
+REGISTRY.gauge('lstm_persistence_retries_total', 'Percobaan ulang commit ke storage yang gagal',
+               lambda: persistence_writer.retries, metric_type='counter')
+REGISTRY.gauge('lstm_offload_in_flight', 'Pekerjaan yang sedang berjalan/antri di pool offload',
+               lambda: offload.in_flight)
+REGISTRY.gauge('lstm_offload_rejected_total', 'Request yang ditolak karena pool offload penuh (503)',
+               lambda: offload.rejected, metric_type='counter')
+
+REGISTRY.gauge('lstm_stream_clients', 'Koneksi /stream yang terbuka', lambda: _stream_clients)
+
+request_log = RateLimitedLogger(logging.getLogger('lstm.requests'), REQUEST_LOG_RATE, REQUEST_LOG_BURST)
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.stages = start_trace()
+
+@app.after_request
+def _record_request(response):
+    """
+    Catat metrik HTTP dan satu baris log JSON (dibatasi REQUEST_LOG_RATE)
+    berisi rincian waktu per tahap. Untuk response streaming, waktu diukur
+    sampai header dikirim.
+    """
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    stages = end_trace()
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    HTTP_LATENCY.observe(elapsed, endpoint=endpoint, method=request.method)
+    fields = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(elapsed * 1000.0, 3),
+        'stages_ms': {name: round(seconds * 1000.0, 3) for name, seconds in stages.items()}
+    }
+    if 'request_error' in g:
+        fields['error'] = g.request_error
+    request_log.log('request', logging.WARNING if response.status_code >= 500 else logging.INFO, **fields)
+    return response
+
+_model_reload_lock = threading.Lock()
+_model_reload_checked = 0.0
+_model_reload_failed = None
+
+def _maybe_reload_model():
+    """
+    Cek (paling sering sekali per MODEL_RELOAD_INTERVAL) apakah versi model
+    aktif di registry berubah. Versi baru dimuat di thread terpisah lalu
+    di-hot-swap; request tetap dilayani model lama selama pemuatan.
+    """
+    global _model_reload_checked
+    now = time.monotonic()
+    if MODEL_RELOAD_INTERVAL <= 0 or now - _model_reload_checked < MODEL_RELOAD_INTERVAL:
+        return
+    if not _model_reload_lock.acquire(blocking=False):
+        return
+    _model_reload_checked = now
+    version = model_registry.current()
+    if version is None or version == model_loader.model_version or version == _model_reload_failed:
+        _model_reload_lock.release()
+        return
+    threading.Thread(target=_reload_model, args=(version,), name='model-reload', daemon=True).start()
+
+def _reload_model(version):
+    global _model_reload_failed
+    try:
+        model_loader.swap_model(model_registry.load(version), version)
+    except Exception as e:
+        _model_reload_failed = version
+        print(f"Gagal memuat model versi {version}: {e}")
+        traceback.print_exc()
+    finally:
+        _model_reload_lock.release()
+
+def _run_prediction(ternak_besar, ternak_kecil, persist, horizon, mc_samples=0, percentiles=(5, 50, 95)):
+    """
+    Prediksi satu skenario (dijalankan di pool offload)
+    """
+    _maybe_reload_model()
+    
+    # Get sequence data
+    data_processor.sync_external_changes()
+    history_version, sequence_data = data_processor.get_versioned_sequence(ternak_besar, ternak_kecil)
+    if sequence_data is None:
+        raise Exception("Gagal mendapatkan data sequence")
+
+    # Make prediction
+    result = model_loader.predict_revenue(ternak_besar, ternak_kecil, sequence_data,
+                                          history_version=history_version, horizon=horizon,
+                                          mc_samples=mc_samples, percentiles=percentiles)
+    
+    # Save entry with average prediction (selalu rata-rata horizon dasar model,
+    # juga saat horizon lebih pendek dari output_size)
+    if persist:
+        data_processor.save_new_entry(ternak_besar, ternak_kecil, result['base_avg_prediction'])
+        # Dorong prediksi yang disimpan ke dashboard yang terhubung ke /stream;
+        # prediksi what-if (persist=false) hanya untuk peminta
+        data_processor.changes.publish('forecast', {**result, 'ternak_besar': ternak_besar,
+                                                    'ternak_kecil': ternak_kecil})
+    return result
+
 @app.route('/predict', methods=['POST'])
 def predict_revenue():
     """
@@ -65,33 +300,43 @@ def predict_revenue():
     Expected JSON payload:
     {
         "ternak_besar": float,
-        "ternak_kecil": float
+        "ternak_kecil": float,
+        "persist": bool (optional, default true),
+        "horizon": int (optional, jumlah hari pasar, default output_size model),
+        "mc_samples": int (optional, sampel MC dropout untuk interval, default 0 = nonaktif),
+        "percentiles": [float] (optional, default [5, 50, 95])
     }
     """
     try:
         data = request.json
         ternak_besar = float(data.get('ternak_besar', 0))
         ternak_kecil = float(data.get('ternak_kecil', 0))
+        persist = bool(data.get('persist', True))
+        horizon = int(data.get('horizon', model_loader.config['output_size']))
+        mc_samples = int(data.get('mc_samples', 0))
+        percentiles = [float(q) for q in data.get('percentiles', [5, 50, 95])]
 
         # Validasi input
         if ternak_besar < 0 or ternak_kecil < 0:
             raise ValueError("Jumlah ternak tidak boleh negatif")
+        if not 1 <= horizon <= PREDICT_MAX_HORIZON:
+            raise ValueError(f"Horizon harus antara 1 dan {PREDICT_MAX_HORIZON}")
+        if not 0 <= mc_samples <= PREDICT_MAX_MC_SAMPLES:
+            raise ValueError(f"mc_samples harus antara 0 dan {PREDICT_MAX_MC_SAMPLES}")
+        if not percentiles or any(not 0 <= q <= 100 for q in percentiles):
+            raise ValueError("Percentiles harus bernilai antara 0 dan 100")
 
-        # Get sequence data
-        sequence_data = data_processor.get_sequence_data(ternak_besar, ternak_kecil)
-        if sequence_data is None:
-            raise Exception("Gagal mendapatkan data sequence")
-
-        # Make prediction
-        result = model_loader.predict_revenue(ternak_besar, ternak_kecil, sequence_data)
-        
-        # Save entry to Excel with average prediction
-        data_processor.save_new_entry(ternak_besar, ternak_kecil, result['avg_prediction'])
-
+        result = offload.run(_run_prediction, ternak_besar, ternak_kecil, persist, horizon,
+                             mc_samples, percentiles)
         return jsonify(result), 200
 
+    except OverloadedError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
     except ValueError as e:
-        print(f"Validation error: {e}")
+        g.request_error = str(e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -104,6 +349,118 @@ def predict_revenue():
             'message': str(e)
         }), 400
 
+def _run_prediction_batch(scenarios, persist, emit):
+    """
+    Prediksi banyak skenario (dijalankan di pool offload); setiap hasil
+    dikirim lewat emit(result) begitu chunk-nya selesai
+    """
+    _maybe_reload_model()
+    data_processor.sync_external_changes()
+    history_version, sequence_data = data_processor.get_versioned_sequence(0, 0)
+    if sequence_data is None:
+        raise Exception("Gagal mendapatkan data sequence")
+
+    results = model_loader.predict_revenue_batch(scenarios, sequence_data, history_version=history_version)
+    for index, ((ternak_besar, ternak_kecil), result) in enumerate(zip(scenarios, results)):
+        if persist:
+            data_processor.save_new_entry(ternak_besar, ternak_kecil, result['avg_prediction'])
+        result.update({'index': index, 'ternak_besar': ternak_besar, 'ternak_kecil': ternak_kecil})
+        emit(result)
+
+def _parse_batch_scenarios():
+    """
+    Ambil daftar skenario dari JSON body atau upload CSV
+    (kolom: ternak_besar, ternak_kecil)
+    """
+    if 'file' in request.files:
+        content = request.files['file'].read().decode('utf-8-sig')
+        reader = csv.DictReader(io.StringIO(content))
+        missing = [column for column in BATCH_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Kolom CSV tidak ditemukan: {', '.join(missing)}")
+        rows = list(reader)
+        persist = request.form.get('persist', 'false').lower() in ('1', 'true', 'yes')
+    else:
+        data = request.get_json(silent=True) or {}
+        rows = data.get('scenarios', [])
+        persist = bool(data.get('persist', False))
+
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("Daftar skenario kosong")
+    if len(rows) > PREDICT_BATCH_MAX_SCENARIOS:
+        raise ValueError(f"Maksimal {PREDICT_BATCH_MAX_SCENARIOS} skenario per request")
+
+    scenarios = []
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError(f"Skenario ke-{i} tidak valid")
+        # Sel kosong atau kolom yang hilang ditolak, bukan dianggap 0
+        empty = [column for column in BATCH_COLUMNS if row.get(column) is None or str(row[column]).strip() == '']
+        if empty:
+            raise ValueError(f"Skenario ke-{i}: {', '.join(empty)} kosong")
+        try:
+            ternak_besar = float(row['ternak_besar'])
+            ternak_kecil = float(row['ternak_kecil'])
+        except (TypeError, ValueError):
+            raise ValueError(f"Skenario ke-{i} tidak valid")
+        if ternak_besar < 0 or ternak_kecil < 0:
+            raise ValueError(f"Skenario ke-{i}: jumlah ternak tidak boleh negatif")
+        scenarios.append((ternak_besar, ternak_kecil))
+    return scenarios, persist
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_revenue_batch():
+    """
+    Endpoint for batch what-if predictions, streamed back as NDJSON
+    
+    Expected JSON payload:
+    {
+        "scenarios": [{"ternak_besar": float, "ternak_kecil": float}, ...],
+        "persist": bool (optional, default false)
+    }
+    or multipart upload with a CSV "file" (columns ternak_besar, ternak_kecil)
+    and optional form field "persist".
+    
+    Semua skenario memakai window riwayat yang sama (snapshot saat request).
+    Prediksi berjalan di pool offload (503 jika penuh) dan tetap selesai
+    walaupun koneksi terputus; hasil dikirim per baris begitu tersedia.
+    """
+    try:
+        scenarios, persist = _parse_batch_scenarios()
+        results = queue.Queue()
+        future = offload.submit(_run_prediction_batch, scenarios, persist, results.put)
+        future.add_done_callback(lambda _: results.put(None))
+    except OverloadedError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
+    except ValueError as e:
+        g.request_error = str(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Batch prediction error: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    def generate():
+        while True:
+            result = results.get()
+            if result is None:
+                break
+            yield json.dumps(result) + '\n'
+        error = future.exception()
+        if error is not None:
+            print(f"Batch prediction error: {error}")
+            yield json.dumps({'status': 'error', 'message': str(error)}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
 @app.route('/revenue_history', methods=['GET'])
 def get_revenue_history():
     """
@@ -114,13 +471,19 @@ def get_revenue_history():
     """
     try:
         days = int(request.args.get('days', 30))
-        history = data_processor.get_revenue_history(days)
+        data_processor.sync_external_changes()
+        history = offload.run(data_processor.get_revenue_history_records, days)
         
         return jsonify({
             'status': 'success',
-            'history': history.to_dict(orient='records')
+            'history': history
         }), 200
 
+    except OverloadedError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
     except Exception as e:
         print(f"History retrieval error: {e}")
         return jsonify({
@@ -128,24 +491,324 @@ def get_revenue_history():
             'message': str(e)
         }), 400
 
+@app.route('/revenue_summary', methods=['GET'])
+def get_revenue_summary():
+    """
+    Endpoint ringkasan pendapatan dari rollup yang sudah dihitung
+    
+    Optional query parameters:
+    - granularity: daily | weekly | monthly | market_day (default daily)
+    - from, to: rentang tanggal inklusif (YYYY-MM-DD)
+    """
+    try:
+        granularity = request.args.get('granularity', 'daily').lower()
+        start = _parse_export_date(request.args.get('from'), 'from')
+        end = _parse_export_date(request.args.get('to'), 'to')
+        data_processor.sync_external_changes()
+        summary = data_processor.get_revenue_summary(granularity, model_loader.target_harian,
+                                                     start=start, end=end)
+        
+        return jsonify({
+            'status': 'success',
+            'granularity': granularity,
+            'target_harian': model_loader.target_harian,
+            'summary': summary
+        }), 200
+
+    except OverloadedError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
+    except Exception as e:
+        print(f"Summary retrieval error: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/import_data', methods=['POST'])
+def import_data():
+    """
+    Endpoint bulk import/backfill riwayat dari upload CSV atau XLSX
+    (kolom: Tanggal, Ternak Besar Masuk, Ternak Kecil Masuk, Total Pendapatan)
+    
+    Multipart form:
+    - file: file .csv atau .xlsx
+    - on_conflict: skip | replace (default skip) untuk tanggal yang sudah ada
+    
+    Progres dikirim sebagai NDJSON (parse, validate, merge per potongan) dan
+    baris terakhir berisi ringkasan termasuk rows_per_second. Import tetap
+    selesai walaupun koneksi terputus.
+    """
+    try:
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            raise ValueError("File import tidak ditemukan")
+        if not upload.filename.lower().endswith(IMPORT_FORMATS):
+            raise ValueError(f"Format file harus salah satu dari: {', '.join(IMPORT_FORMATS)}")
+        on_conflict = request.form.get('on_conflict', 'skip').lower()
+        if on_conflict not in ('skip', 'replace'):
+            raise ValueError("on_conflict harus skip atau replace")
+        content = io.BytesIO(upload.read())
+        filename = upload.filename
+
+        events = queue.Queue()
+        future = offload.submit(bulk_import, data_processor, content, filename,
+                                replace=on_conflict == 'replace', chunk_size=IMPORT_CHUNK_SIZE,
+                                progress=events.put)
+        future.add_done_callback(lambda _: events.put(None))
+    except OverloadedError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
+    except ValueError as e:
+        g.request_error = str(e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    def generate():
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield json.dumps(event) + '\n'
+        error = future.exception()
+        if error is not None:
+            print(f"Import error: {error}")
+            yield json.dumps({'status': 'error', 'message': str(error)}) + '\n'
+        else:
+            yield json.dumps({'status': 'success', **future.result()}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def _parse_export_date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        raise ValueError(f"Parameter {name} harus berformat YYYY-MM-DD")
+
+def _put_until_cancelled(parts, item, cancelled):
+    """
+    Masukkan item ke antrian terbatas; menyerah jika klien sudah terputus
+    """
+    while not cancelled.is_set():
+        try:
+            parts.put(item, timeout=1.0)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _encode_export(chunks, export_format, parts, cancelled):
+    """
+    Encode export per potongan (dijalankan di pool offload). Antrian dibatasi,
+    jadi encoding mengikuti kecepatan klien dan berhenti jika klien terputus.
+    """
+    try:
+        for part in stream_export(chunks, export_format):
+            if not _put_until_cancelled(parts, part, cancelled):
+                return
+    except Exception as e:
+        _put_until_cancelled(parts, e, cancelled)
+    finally:
+        chunks.close()
+        _put_until_cancelled(parts, None, cancelled)
+
 @app.route('/export_data', methods=['GET'])
 def export_data():
     """
-    Endpoint to export Excel data
+    Endpoint to export history, streamed per chunk from storage
+    
+    Optional query parameters:
+    - format: csv | parquet | arrow | xlsx (default xlsx)
+    - from, to: rentang tanggal inklusif (YYYY-MM-DD)
+    
+    Response memakai ETag; request dengan If-None-Match yang cocok mendapat 304.
+    Encoding berjalan di pool offload (503 jika penuh).
     """
+    chunks = None
     try:
-        return send_from_directory(
-            os.path.join(BASE_DIR, 'data'), 
-            'Modeldata.xlsx', 
-            as_attachment=True
-        )
+        export_format = request.args.get('format', 'xlsx').lower()
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Format harus salah satu dari: {', '.join(EXPORT_FORMATS)}")
+        start = _parse_export_date(request.args.get('from'), 'from')
+        end = _parse_export_date(request.args.get('to'), 'to')
+
+        # ETag dan isi export berasal dari snapshot baca yang sama
+        fingerprint, chunks = data_processor.export_snapshot(start=start, end=end, chunk_size=EXPORT_CHUNK_SIZE)
+        etag = hashlib.sha1(f"{fingerprint}|{export_format}|{start}|{end}".encode('utf-8')).hexdigest()
+        if request.if_none_match.contains(etag):
+            chunks.close()
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        parts = queue.Queue(maxsize=8)
+        cancelled = threading.Event()
+        offload.submit(_encode_export, chunks, export_format, parts, cancelled)
+    except OverloadedError as e:
+        if chunks is not None:
+            chunks.close()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
     except Exception as e:
+        if chunks is not None:
+            chunks.close()
         print(f"Export error: {e}")
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 400
 
+    def generate():
+        try:
+            while True:
+                part = parts.get()
+                if part is None:
+                    break
+                if isinstance(part, Exception):
+                    print(f"Export error: {part}")
+                    raise part
+                yield part
+        finally:
+            cancelled.set()
+
+    response = Response(generate(), mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Content-Disposition'] = f'attachment; filename=Modeldata.{extension}'
+    return response
+
+_stream_lock = threading.Lock()
+_stream_clients = 0
+
+def _release_stream_slot():
+    global _stream_clients
+    with _stream_lock:
+        _stream_clients -= 1
+
+def _parse_stream_cursor(last_event_id, feed):
+    """
+    Nomor urut dari Last-Event-ID ("<epoch>-<seq>"), atau None jika berasal
+    dari proses lain / tidak valid
+    """
+    epoch, _, seq = (last_event_id or '').partition('-')
+    if epoch != feed.epoch or not seq.isdigit():
+        return None
+    return int(seq)
+
+def _format_stream_events(events, event_id):
+    """
+    Gabungkan event yang tertunda menjadi pesan SSE: semua baris riwayat baru
+    dalam satu pesan 'history' dan hanya prediksi terbaru
+    """
+    reset, rows, forecast = False, [], None
+    for _, event, payload in events:
+        if event == 'reset':
+            # Klien mengambil ulang seluruh riwayat; delta sebelumnya tidak perlu
+            reset, rows, forecast = True, [], None
+        elif event == 'history':
+            rows.append(payload)
+        elif event == 'forecast':
+            forecast = payload
+    messages = []
+    if reset:
+        messages.append(f"id: {event_id}\nevent: reset\ndata: {{}}\n\n")
+    if rows:
+        messages.append(f"id: {event_id}\nevent: history\ndata: {{\"rows\": [{','.join(rows)}]}}\n\n")
+    if forecast is not None:
+        messages.append(f"id: {event_id}\nevent: forecast\ndata: {forecast}\n\n")
+    return ''.join(messages)
+
+@app.route('/stream', methods=['GET'])
+def stream():
+    """
+    Server-sent events untuk dashboard. Event:
+    - history: {"rows": [{"Tanggal", "Total_Pendapatan"}, ...]} baris riwayat baru
+    - forecast: hasil /predict terbaru yang disimpan (persist), format sama dengan response /predict
+    - reset: riwayat dimuat ulang, ambil ulang /revenue_history
+    
+    Klien yang tersambung ulang mengirim Last-Event-ID dan hanya menerima
+    event yang terlewat (atau reset jika sudah tidak ada di buffer).
+    Setiap koneksi memakai satu thread; dibatasi STREAM_MAX_CLIENTS.
+    """
+    global _stream_clients
+    with _stream_lock:
+        if _stream_clients >= STREAM_MAX_CLIENTS:
+            return jsonify({
+                'status': 'error',
+                'message': 'Terlalu banyak koneksi /stream'
+            }), 503
+        _stream_clients += 1
+
+    feed = data_processor.changes
+    last_event_id = request.headers.get('Last-Event-ID')
+    cursor = _parse_stream_cursor(last_event_id, feed)
+
+    def generate():
+        nonlocal cursor
+        yield 'retry: 3000\n\n'
+        if cursor is None:
+            cursor = feed.cursor()
+            if last_event_id:
+                # Tersambung ulang ke proses lain: nomor urut lama tidak berlaku
+                yield f"id: {feed.epoch}-{cursor}\nevent: reset\ndata: {{}}\n\n"
+        while True:
+            events, latest = feed.wait(cursor, STREAM_KEEPALIVE_SECONDS)
+            if events is None:
+                events = [(latest, 'reset', '{}')]
+            if events:
+                yield _format_stream_events(events, f"{feed.epoch}-{latest}")
+            else:
+                # Sekalian cek tulisan dari worker lain (memicu event reset);
+                # storage yang macet dicoba lagi pada keepalive berikutnya
+                try:
+                    data_processor.sync_external_changes()
+                except OverloadedError:
+                    pass
+                yield ': keepalive\n\n'
+            cursor = latest
+
+    response = Response(generate(), mimetype='text/event-stream')
+    # Dipanggil saat koneksi ditutup, juga jika generator belum sempat berjalan
+    response.call_on_close(_release_stream_slot)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/inference_stats', methods=['GET'])
+def inference_stats():
+    """
+    Endpoint untuk metrik micro-batching scheduler, cache prediksi dan antrian penulisan
+    """
+    return jsonify({
+        'status': 'success',
+        'model_version': model_loader.model_version,
+        'scaler': model_loader.scaler.stats(),
+        'batching': model_loader.scheduler is not None,
+        'scheduler': model_loader.scheduler.stats() if model_loader.scheduler is not None else None,
+        'cache': model_loader.cache.stats() if model_loader.cache is not None else None,
+        'persistence': persistence_writer.stats(),
+        'offload': offload.stats()
+    }), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Endpoint metrik format teks Prometheus: latency per tahap
+    (lstm_stage_duration_seconds), request HTTP, antrian dan cache
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def serve_frontend():
     """
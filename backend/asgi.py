@@ -0,0 +1,23 @@
+"""
+Entry point ASGI untuk backend.
+
+Route Flask yang sama (/predict, /predict/batch, /revenue_history, /export_data, ...)
+dibungkus a2wsgi WSGIMiddleware: event loop hanya menerima koneksi dan mengirim
+response (termasuk stream NDJSON), sedangkan setiap view berjalan di thread pool
+terbatas (ASGI_THREADS). Pekerjaan model/pandas di dalam view dibatasi lagi oleh
+pool offload (OFFLOAD_WORKERS / OFFLOAD_MAX_PENDING).
+
+Jalankan dengan:
+    python serve.py --mode asgi --workers 2
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 32))
+# Batas klien /stream di app diturunkan dari jumlah thread ini
+os.environ.setdefault('WORKER_THREADS', str(ASGI_THREADS))
+
+from app import app as flask_app
+
+application = WSGIMiddleware(flask_app, workers=ASGI_THREADS)
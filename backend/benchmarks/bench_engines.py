@@ -0,0 +1,101 @@
+"""
+Bandingkan latency per call dan RSS untuk setiap inference engine.
+Setiap engine dijalankan di proses terpisah agar angka RSS tidak saling bercampur.
+
+Jalankan dari folder backend (setelah python export_model.py):
+    python benchmarks/bench_engines.py --batch 1 --calls 500
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+ENGINES = ['eager', 'quantized', 'torchscript', 'onnxruntime']
+
+
+def rss_mb():
+    # ru_maxrss dalam KB di Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_child(engine, batch, calls):
+    import numpy as np
+    from utils.model_loader import LSTMModelLoader, load_model_config
+    from utils.inference_engines import configure_threads
+
+    models_dir = os.path.join(BACKEND_DIR, 'Models')
+    config = load_model_config(os.path.join(models_dir, 'config.json'))
+    configure_threads(config.get('num_threads'), config.get('num_interop_threads'))
+    loader = LSTMModelLoader(
+        os.path.join(models_dir, 'model_weights.pth'),
+        input_size=config['input_size'],
+        hidden_size=config['hidden_size'],
+        num_layers=config['num_layers'],
+        output_size=config['output_size'],
+        dropout_rate=config['dropout_rate'],
+        window_size=config['window_size'],
+        engine=engine,
+        num_threads=config.get('num_threads')
+    )
+    if loader.engine.name != engine:
+        return {'engine': engine, 'error': 'engine tidak tersedia (fallback ke eager)'}
+
+    sample = np.random.default_rng(0).uniform(
+        0, 1, (batch, config['window_size'], config['input_size'])).astype(np.float32)
+    for _ in range(20):
+        loader.forward_batch(sample)
+
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        loader.forward_batch(sample)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    timings.sort()
+    return {
+        'engine': engine,
+        'batch': batch,
+        'mean_ms': sum(timings) / len(timings),
+        'p50_ms': timings[len(timings) // 2],
+        'p99_ms': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        'max_rss_mb': rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--batch', type=int, default=1)
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--child', choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.batch, args.calls)))
+        return
+
+    print(f"{'engine':<12} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'RSS MB':>9}")
+    for engine in args.engines:
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', engine, '--batch', str(args.batch), '--calls', str(args.calls)],
+            capture_output=True, text=True
+        )
+        try:
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            print(f"{engine:<12} gagal: {output.stderr.strip().splitlines()[-1:]}")
+            continue
+        if 'error' in result:
+            print(f"{engine:<12} {result['error']}")
+            continue
+        print(f"{engine:<12} {result['mean_ms']:9.3f} {result['p50_ms']:9.3f} "
+              f"{result['p99_ms']:9.3f} {result['max_rss_mb']:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Cek perilaku horizon /predict:
+
+1. /predict dengan persist dan horizon < output_size menyimpan rata-rata
+   blok pertama model (output_size langkah), bukan rata-rata `horizon` nilai.
+2. Rollout yang diperpanjang dari cache (horizon pendek lalu panjang) sama
+   dengan rollout horizon panjang yang dihitung baru tanpa cache (rtol 1e-4),
+   dan horizon pendek adalah awalan dari horizon panjang.
+
+Data ditulis ke database sementara (HISTORY_DB_PATH), bukan data asli.
+
+Jalankan dari folder backend:
+    python benchmarks/check_rollout.py --horizon 104 --scenarios 20
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def check_saved_average(backend_app, short_horizon):
+    """
+    Nilai yang disimpan /predict harus rata-rata blok pertama model
+    """
+    client = backend_app.app.test_client()
+    output_size = backend_app.model_loader.config['output_size']
+    scenario = {'ternak_besar': 37, 'ternak_kecil': 11}
+
+    full = client.post('/predict', json={**scenario, 'persist': False, 'horizon': output_size}).get_json()
+    expected = float(np.mean([item['nilai'] for item in full['predictions']]))
+
+    short = client.post('/predict', json={**scenario, 'persist': True, 'horizon': short_horizon}).get_json()
+    assert len(short['predictions']) == short_horizon, short
+    saved = backend_app.data_processor.history_values()[-1, 2]
+    np.testing.assert_allclose(saved, expected, rtol=1e-9)
+    np.testing.assert_allclose(short['base_avg_prediction'], expected, rtol=1e-9)
+    print(f"horizon={short_horizon} < output_size={output_size}: tersimpan {saved:.2f} "
+          f"= rata-rata {output_size} langkah (rata-rata {short_horizon} nilai: {short['avg_prediction']:.2f})")
+
+
+def check_cached_extension(loader, horizon, scenarios, rtol):
+    """
+    Rollout yang diperpanjang dari cache harus sama dengan rollout baru
+    """
+    rng = np.random.default_rng(0)
+    max_diff = 0.0
+    for i in range(scenarios):
+        ternak_besar, ternak_kecil = float(rng.integers(0, 400)), float(rng.integers(0, 100))
+        window = np.column_stack([
+            rng.integers(50, 400, loader.window_size),
+            rng.integers(10, 100, loader.window_size),
+            rng.uniform(1e5, 9e5, loader.window_size)
+        ]).astype(np.float64)
+
+        # Tanpa history_version cache tidak dipakai: rollout dihitung dari awal
+        fresh = loader.predict_revenue(ternak_besar, ternak_kecil, window.copy(), horizon=horizon)
+        # Horizon pendek mengisi cache, horizon panjang melanjutkan dari state tersimpan
+        short = loader.predict_revenue(ternak_besar, ternak_kecil, window.copy(), history_version=i,
+                                       horizon=horizon // 2)
+        extended = loader.predict_revenue(ternak_besar, ternak_kecil, window.copy(), history_version=i,
+                                          horizon=horizon)
+
+        expected = np.array([item['nilai'] for item in fresh['predictions']])
+        actual = np.array([item['nilai'] for item in extended['predictions']])
+        prefix = np.array([item['nilai'] for item in short['predictions']])
+        assert len(actual) == horizon and len(prefix) == horizon // 2
+        np.testing.assert_allclose(actual, expected, rtol=rtol)
+        np.testing.assert_allclose(prefix, expected[:horizon // 2], rtol=rtol)
+        max_diff = max(max_diff, float(np.max(np.abs(actual - expected) / np.abs(expected))))
+
+    print(f"horizon={horizon}, scenarios={scenarios}: cache diperpanjang = rollout baru "
+          f"(max relative diff {max_diff:.2e}, rtol {rtol:g})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--horizon', type=int, default=104)
+    parser.add_argument('--short-horizon', type=int, default=3)
+    parser.add_argument('--scenarios', type=int, default=20)
+    parser.add_argument('--rtol', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='check-rollout-')
+    os.environ['HISTORY_DB_PATH'] = os.path.join(tmp_dir, 'history.db')
+    os.environ['MODEL_RELOAD_INTERVAL'] = '0'
+    try:
+        import app as backend_app
+
+        check_saved_average(backend_app, args.short_horizon)
+        # Cache baru: history_version sintetis tidak boleh bertabrakan dengan entri /predict di atas
+        backend_app.model_loader.enable_cache()
+        check_cached_extension(backend_app.model_loader, args.horizon, args.scenarios, args.rtol)
+        backend_app.persistence_writer.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Cek kebenaran rollup /revenue_summary: RevenueRollups yang diisi inkremental
+(entri disisipkan dalam urutan acak, termasuk tanggal lampau dan beberapa
+entri per hari) harus sama dengan rebuild vektorisasi dan dengan groupby
+pandas untuk setiap granularity.
+
+Jalankan dari folder backend:
+    python benchmarks/check_rollups.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rollups import GRANULARITIES, MARKET_DAYS, RevenueRollups
+
+TARGET_HARIAN = 476190
+FIELDS = ('mulai', 'jumlah_entri', 'jumlah_hari', 'total_pendapatan', 'ternak_besar', 'ternak_kecil')
+
+
+def pandas_summary(df, granularity):
+    """
+    Ringkasan acuan per bucket dengan groupby pandas
+    """
+    dates = df['Tanggal']
+    if granularity == 'market_day':
+        df = df[dates.dt.weekday.isin(list(MARKET_DAYS))]
+        dates = df['Tanggal']
+    if granularity == 'weekly':
+        start = dates.dt.to_period('W-SUN').dt.start_time
+    elif granularity == 'monthly':
+        start = dates.dt.to_period('M').dt.start_time
+    else:
+        start = dates
+    grouped = df.assign(mulai=start).groupby('mulai')
+    summary = pd.DataFrame({
+        'jumlah_entri': grouped.size(),
+        'jumlah_hari': grouped['Tanggal'].nunique(),
+        'total_pendapatan': grouped['Total Pendapatan'].sum(),
+        'ternak_besar': grouped['Ternak Besar Masuk'].sum(),
+        'ternak_kecil': grouped['Ternak Kecil Masuk'].sum()
+    }).reset_index()
+    summary['mulai'] = summary['mulai'].dt.strftime('%Y-%m-%d')
+    return summary[list(FIELDS)]
+
+
+def as_frame(records):
+    return pd.DataFrame([{field: record[field] for field in FIELDS} for record in records], columns=FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=20000, help='rentang tanggal (hari) sejak 1980-01-01')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Tanggal': pd.Timestamp('1980-01-01') + pd.to_timedelta(rng.integers(0, args.days, args.rows), unit='D'),
+        'Ternak Besar Masuk': rng.integers(0, 400, args.rows).astype(float),
+        'Ternak Kecil Masuk': rng.integers(0, 100, args.rows).astype(float),
+        'Total Pendapatan': rng.uniform(1e5, 9e5, args.rows).round(2)
+    })
+    values = df[['Ternak Besar Masuk', 'Ternak Kecil Masuk', 'Total Pendapatan']].to_numpy()
+    day_strings = df['Tanggal'].dt.strftime('%Y-%m-%d').tolist()
+
+    started = time.perf_counter()
+    incremental = RevenueRollups()
+    for i in rng.permutation(args.rows):
+        incremental.add(day_strings[i], values[i])
+    incremental_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    order = np.argsort(df['Tanggal'].to_numpy(), kind='stable')
+    rebuilt = RevenueRollups()
+    rebuilt.rebuild(df['Tanggal'].to_numpy().astype('datetime64[D]')[order], values[order])
+    rebuild_seconds = time.perf_counter() - started
+
+    for granularity in GRANULARITIES:
+        expected = pandas_summary(df, granularity)
+        for name, rollups in (('inkremental', incremental), ('rebuild', rebuilt)):
+            actual = as_frame(rollups.summary(granularity, TARGET_HARIAN))
+            try:
+                pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+            except AssertionError as e:
+                raise AssertionError(f"{granularity} ({name}) berbeda dari pandas: {e}")
+        print(f"{granularity:>10}: {len(expected):6d} bucket OK")
+
+    print(f"rows={args.rows}: add acak {incremental_seconds:.2f} s "
+          f"({incremental_seconds / args.rows * 1e6:.1f} us/entri), rebuild {rebuild_seconds:.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Load test HTTP untuk /predict dan /revenue_history: requests per second dan p50/p99.
+
+Menjalankan server sendiri untuk setiap mode lalu menembakkan request bersamaan:
+    python benchmarks/load_test.py --modes dev wsgi asgi --concurrency 16 --requests 2000
+
+Mode:
+    dev   python app.py (server Werkzeug bawaan, port 5000)
+    wsgi  python serve.py --mode wsgi
+    asgi  python serve.py --mode asgi
+Atau uji server yang sudah berjalan dengan --url http://host:port
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(mode, port, workers):
+    if mode == 'dev':
+        command = [sys.executable, 'app.py']
+        port = 5000
+    else:
+        command = [sys.executable, 'serve.py', '--mode', mode, '--port', str(port), '--workers', str(workers)]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/inference_stats')
+            if conn.getresponse().status == 200:
+                return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.5)
+    process.kill()
+    raise RuntimeError(f"Server mode {mode} tidak siap dalam 120 detik")
+
+
+def run_load(url, method, path, body, concurrency, total):
+    target = urlparse(url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        conn = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+        local = []
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[0] += 1
+            except OSError:
+                errors[0] += 1
+                conn = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+                continue
+            local.append((time.perf_counter() - started) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    if not latencies:
+        return {'rps': 0.0, 'p50_ms': None, 'p99_ms': None, 'errors': errors[0]}
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2],
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'errors': errors[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', choices=['dev', 'wsgi', 'asgi'], default=['dev', 'asgi'])
+    parser.add_argument('--url', help='uji server yang sudah berjalan (mengabaikan --modes)')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--persist', action='store_true', help='simpan setiap prediksi ke storage')
+    args = parser.parse_args()
+
+    scenarios = [
+        ('POST', '/predict', json.dumps({'ternak_besar': 150, 'ternak_kecil': 40, 'persist': args.persist})),
+        ('GET', '/revenue_history?days=30', None)
+    ]
+    targets = [('external', args.url)] if args.url else [(mode, None) for mode in args.modes]
+
+    print(f"{'mode':<9} {'endpoint':<26} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode, url in targets:
+        process = None
+        if url is None:
+            process, url = start_server(mode, args.port, args.workers)
+        try:
+            for method, path, body in scenarios:
+                # Pemanasan singkat sebelum pengukuran
+                run_load(url, method, path, body, args.concurrency, args.concurrency * 5)
+                result = run_load(url, method, path, body, args.concurrency, args.requests)
+                p50 = f"{result['p50_ms']:9.2f}" if result['p50_ms'] is not None else f"{'-':>9}"
+                p99 = f"{result['p99_ms']:9.2f}" if result['p99_ms'] is not None else f"{'-':>9}"
+                print(f"{mode:<9} {method + ' ' + path:<26} {result['rps']:9.1f} {p50} {p99} {result['errors']:7d}")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Laporan memori per worker Gunicorn (RSS, PSS, USS dari /proc/<pid>/smaps_rollup)
+dengan dan tanpa preload_app, untuk membuktikan penghematan copy-on-write.
+
+Memori diukur dua kali: setelah request baca (prediksi tanpa simpan dan
+riwayat), lalu setelah /predict yang menyimpan entri. Penulisan di satu worker
+membuat worker lain menerapkan entri baru ke index di memorinya, jadi tahap
+kedua menunjukkan berapa halaman bersama yang tetap bersama setelah data berubah.
+Entri ditulis ke salinan sementara history.db (HISTORY_DB_PATH), bukan data asli.
+
+Jalankan dari folder backend (Linux):
+    python benchmarks/memory_report.py --workers 4
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def smaps_rollup(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss_mb': fields.get('Rss', 0) / 1024.0,
+        'pss_mb': fields.get('Pss', 0) / 1024.0,
+        'uss_mb': (fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024.0
+    }
+
+
+def children(pid):
+    found = []
+    for task in os.listdir(f'/proc/{pid}/task'):
+        with open(f'/proc/{pid}/task/{task}/children') as f:
+            found.extend(int(child) for child in f.read().split())
+    return found
+
+
+def _post_predict(port, persist):
+    body = json.dumps({'ternak_besar': 150, 'ternak_kecil': 40, 'persist': persist})
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/predict', body=body, headers={'Content-Type': 'application/json'})
+    conn.getresponse().read()
+    conn.request('GET', '/revenue_history?days=90')
+    conn.getresponse().read()
+    conn.close()
+
+
+def snapshot(master_pid):
+    return smaps_rollup(master_pid), [smaps_rollup(pid) for pid in children(master_pid)]
+
+
+def measure(preload, workers, port, requests, writes):
+    db_dir = tempfile.mkdtemp(prefix='memory-report-')
+    db_path = os.path.join(db_dir, 'history.db')
+    source_db = os.path.join(BACKEND_DIR, 'data', 'history.db')
+    if os.path.exists(source_db):
+        shutil.copy(source_db, db_path)
+    env = dict(os.environ, PRELOAD_APP='1' if preload else '0', HISTORY_DB_PATH=db_path)
+    master = subprocess.Popen(
+        [sys.executable, 'serve.py', '--mode', 'wsgi', '--workers', str(workers), '--port', str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 180
+        while time.time() < deadline:
+            if len(children(master.pid)) == workers:
+                try:
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+                    conn.request('GET', '/inference_stats')
+                    if conn.getresponse().status == 200:
+                        break
+                except OSError:
+                    pass
+            time.sleep(0.5)
+        else:
+            raise RuntimeError("Gunicorn tidak siap dalam 180 detik")
+
+        # Layani beberapa request agar setiap worker benar-benar menyentuh model dan data
+        for _ in range(requests):
+            _post_predict(port, persist=False)
+        time.sleep(1)
+        reads = snapshot(master.pid)
+
+        # Entri tersimpan di worker mana pun; request baca berikutnya membuat
+        # worker lain menyinkronkan entri tersebut
+        for _ in range(writes):
+            _post_predict(port, persist=True)
+        for _ in range(requests):
+            _post_predict(port, persist=False)
+        time.sleep(1)
+        return {'reads': reads, 'writes': snapshot(master.pid)}
+    finally:
+        # SIGINT = quick shutdown gunicorn (SIGTERM menunggu graceful timeout)
+        master.send_signal(signal.SIGINT)
+        try:
+            master.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            master.kill()
+            master.wait()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5057)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--writes', type=int, default=50, help='/predict dengan persist=True')
+    args = parser.parse_args()
+
+    for preload in (False, True):
+        phases = measure(preload, args.workers, args.port, args.requests, args.writes)
+        for phase, (master, workers) in phases.items():
+            print(f"== preload_app={preload}, setelah {phase}")
+            print(f"   master   RSS {master['rss_mb']:7.1f} MB  PSS {master['pss_mb']:7.1f} MB  USS {master['uss_mb']:7.1f} MB")
+            for i, worker in enumerate(workers):
+                print(f"   worker {i} RSS {worker['rss_mb']:7.1f} MB  PSS {worker['pss_mb']:7.1f} MB  USS {worker['uss_mb']:7.1f} MB")
+            total_pss = master['pss_mb'] + sum(worker['pss_mb'] for worker in workers)
+            total_uss = sum(worker['uss_mb'] for worker in workers)
+            print(f"   total PSS {total_pss:.1f} MB, total USS worker {total_uss:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
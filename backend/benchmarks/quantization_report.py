@@ -0,0 +1,101 @@
+"""
+Laporan dynamic int8 quantization vs fp32: drift akurasi pada data historis
+(Modeldata.xlsx), latency per call, dan ukuran bobot model.
+
+Jalankan dari folder backend:
+    python benchmarks/quantization_report.py --threads 1
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import torch
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from utils.inference_engines import QuantizedEngine, configure_threads
+from utils.model_loader import LSTMModelLoader, load_model_config
+from utils.storage import COLUMNS
+
+MODELS_DIR = os.path.join(BACKEND_DIR, 'Models')
+DATA_PATH = os.path.join(BACKEND_DIR, 'data', 'Modeldata.xlsx')
+
+
+def history_windows(df, window_size):
+    """Satu window (zero-padded) untuk setiap baris historis, seperti get_sequence_data"""
+    features = df[COLUMNS[1:]].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=float)
+    windows = np.zeros((len(features), window_size, features.shape[1]))
+    for end in range(1, len(features) + 1):
+        history = features[max(0, end - window_size):end]
+        windows[end - 1, window_size - len(history):] = history
+    return windows
+
+
+def state_dict_bytes(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def latency_ms(engine, sample, calls):
+    for _ in range(20):
+        engine(sample)
+    started = time.perf_counter()
+    for _ in range(calls):
+        engine(sample)
+    return (time.perf_counter() - started) * 1000.0 / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--calls', type=int, default=500)
+    args = parser.parse_args()
+
+    configure_threads(args.threads, 1)
+    config = load_model_config(os.path.join(MODELS_DIR, 'config.json'))
+    loader = LSTMModelLoader(
+        os.path.join(MODELS_DIR, 'model_weights.pth'),
+        input_size=config['input_size'],
+        hidden_size=config['hidden_size'],
+        num_layers=config['num_layers'],
+        output_size=config['output_size'],
+        dropout_rate=config['dropout_rate'],
+        window_size=config['window_size']
+    )
+    fp32 = loader.engine
+    int8 = QuantizedEngine(loader.model)
+
+    df = pd.read_excel(DATA_PATH)
+    windows = history_windows(df, config['window_size'])
+    revenue = windows[:, -1, 2]
+    normalized = (windows * loader._scale + loader._offset).astype(np.float32)
+
+    raw_fp32 = fp32(normalized)
+    raw_int8 = int8(normalized)
+    rupiah_fp32 = np.stack([loader._postprocess(r, c) for r, c in zip(raw_fp32, revenue)])
+    rupiah_int8 = np.stack([loader._postprocess(r, c) for r, c in zip(raw_int8, revenue)])
+    rupiah_diff = np.abs(rupiah_int8 - rupiah_fp32)
+    status_flips = np.mean((rupiah_fp32 < loader.target_harian) != (rupiah_int8 < loader.target_harian))
+
+    sample = normalized[-1:]
+    fp32_ms = latency_ms(fp32, sample, args.calls)
+    int8_ms = latency_ms(int8, sample, args.calls)
+    fp32_bytes = state_dict_bytes(fp32.model)
+    int8_bytes = state_dict_bytes(int8.model)
+
+    print(f"Windows historis     : {len(windows)} (dari {DATA_PATH})")
+    print(f"Max |raw diff|       : {np.max(np.abs(raw_int8 - raw_fp32)):.2e}")
+    print(f"Mean |diff| rupiah   : Rp {rupiah_diff.mean():,.2f}")
+    print(f"Max |diff| rupiah    : Rp {rupiah_diff.max():,.2f}")
+    print(f"Status KURANG/TERCAPAI berubah: {status_flips:.2%}")
+    print(f"Latency fp32 / int8  : {fp32_ms:.3f} ms / {int8_ms:.3f} ms ({fp32_ms / int8_ms:.2f}x)")
+    print(f"Bobot fp32 / int8    : {fp32_bytes / 1024:.1f} KB / {int8_bytes / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
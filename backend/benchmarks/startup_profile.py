@@ -0,0 +1,56 @@
+"""
+Profil cold start: waktu import per package (python -X importtime) dan total
+waktu `import app`, untuk mode fast boot dan mode lama.
+
+Jalankan dari folder backend:
+    python benchmarks/startup_profile.py --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(env_overrides, top):
+    env = dict(os.environ, **env_overrides)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Baris: "import time: self [us] | cumulative | imported package"
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        root = name.strip().split('.')[0]
+        # Ambil kemunculan terbesar (import pertama yang memuat package tsb)
+        packages[root] = max(packages.get(root, 0), int(cumulative))
+
+    packages.pop('app', None)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return wall, ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    for label, env in [('fast boot', {'FAST_BOOT': '1'}), ('legacy', {'FAST_BOOT': '0'})]:
+        wall, ranked = profile(env, args.top)
+        print(f"== {label}: import app = {wall:.2f} s (termasuk start interpreter)")
+        for name, cumulative in ranked:
+            print(f"   {cumulative / 1e6:7.3f} s  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,430 @@
+"""
+Suite benchmark yang dapat diulang: microbenchmark DataProcessor dan
+LSTMModelLoader atas riwayat sintetis, plus load test HTTP /predict dan
+/revenue_history lewat Flask test client dan server lokal (in-process).
+Hasil ditulis ke JSON; mode compare menandai regresi antar run.
+
+Jalankan dari folder backend:
+    python benchmarks/suite.py run --sizes 1000 10000 100000 1000000 --output before.json
+    python benchmarks/suite.py run --output after.json
+    python benchmarks/suite.py compare before.json after.json --threshold 0.10
+
+compare keluar dengan kode 1 jika ada regresi di atas threshold.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from utils.data_processor import DataProcessor
+from utils.inference_engines import configure_threads
+from utils.model_loader import LSTMModelLoader, load_model_config
+from utils.persistence import PersistenceWriter
+from utils.storage import SQLiteStorage
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+# Riwayat sintetis mencakup 10 tahun terakhir; ukuran besar berarti
+# banyak baris per tanggal (seperti entri /predict yang disimpan berulang)
+HISTORY_DAYS = 3650
+
+# Metrik yang dibandingkan di mode compare: (nama, True jika lebih besar lebih baik)
+COMPARED_METRICS = {
+    'micro': [('median_us', False), ('p90_us', False)],
+    'http': [('p50_ms', False), ('p99_ms', False), ('rps', True)]
+}
+
+
+def synthetic_history(rows, seed=0):
+    """
+    Riwayat acak (seed tetap) dengan tanggal terurut yang berakhir hari ini
+    """
+    rng = np.random.default_rng(seed)
+    today = datetime.now().date()
+    offsets = np.sort(rng.integers(0, min(rows, HISTORY_DAYS), rows))[::-1]
+    dates = pd.to_datetime(today) - pd.to_timedelta(offsets, unit='D')
+    ternak_besar = rng.integers(50, 400, rows).astype(float)
+    ternak_kecil = rng.integers(10, 100, rows).astype(float)
+    return pd.DataFrame({
+        'Tanggal': dates.strftime('%Y-%m-%d'),
+        'Ternak Besar Masuk': ternak_besar,
+        'Ternak Kecil Masuk': ternak_kecil,
+        'Total Pendapatan': ternak_besar * 2000 + ternak_kecil * 1000 + rng.normal(0, 5e4, rows)
+    })
+
+
+def build_processor(tmp_dir, rows, window_size, seed=0):
+    """
+    DataProcessor di atas SQLite sementara berisi `rows` baris sintetis,
+    dengan PersistenceWriter seperti di app.py
+    """
+    storage = SQLiteStorage(os.path.join(tmp_dir, f'bench-{rows}.db'))
+    storage.rewrite(synthetic_history(rows, seed))
+    writer = PersistenceWriter(storage)
+    started = time.perf_counter()
+    processor = DataProcessor(os.path.join(tmp_dir, 'unused.xlsx'), storage=storage,
+                              window_size=window_size, writer=writer)
+    processor.df  # muat sekarang, bukan saat pengukuran pertama
+    load_seconds = time.perf_counter() - started
+    return processor, writer, load_seconds
+
+
+def build_model_loader(threads):
+    models_dir = os.path.join(BACKEND_DIR, 'Models')
+    config = load_model_config(os.path.join(models_dir, 'config.json'))
+    configure_threads(threads or config.get('num_threads'), config.get('num_interop_threads'))
+    return LSTMModelLoader(
+        os.path.join(models_dir, 'model_weights.pth'),
+        input_size=config['input_size'],
+        hidden_size=config['hidden_size'],
+        num_layers=config['num_layers'],
+        output_size=config['output_size'],
+        dropout_rate=config['dropout_rate'],
+        window_size=config['window_size'],
+        engine=config.get('engine', 'eager'),
+        num_threads=threads or config.get('num_threads')
+    )
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def time_calls(fn, repeat, warmup=20):
+    """
+    Jalankan fn() `repeat` kali dan kembalikan statistik latency (mikrodetik)
+    """
+    for i in range(warmup):
+        fn(i)
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        'calls': repeat,
+        'median_us': _percentile(timings, 0.5),
+        'p90_us': _percentile(timings, 0.9),
+        'p99_us': _percentile(timings, 0.99),
+        'min_us': timings[0],
+        'mean_us': sum(timings) / len(timings)
+    }
+
+
+def run_micro(processor, writer, model_loader, repeat):
+    """
+    Microbenchmark per fungsi. Input ternak berubah per panggilan agar
+    prediksi tidak terlayani cache.
+    """
+    results = {}
+    results['get_sequence_data'] = time_calls(
+        lambda i: processor.get_sequence_data(100 + i % 300, 20 + i % 80), repeat)
+
+    sequence = processor.get_sequence_data(150, 40)
+    results['predict_revenue'] = time_calls(
+        lambda i: model_loader.predict_revenue(100 + i % 300, 20 + i % 80, sequence), repeat)
+
+    results['get_revenue_history_30d'] = time_calls(
+        lambda i: processor.get_revenue_history_records(30), repeat)
+    results['get_revenue_history_365d'] = time_calls(
+        lambda i: processor.get_revenue_history_records(365), repeat)
+
+    # Terakhir, karena menambah baris ke riwayat; waktu flush ke disk dicatat terpisah
+    results['save_new_entry'] = time_calls(
+        lambda i: processor.save_new_entry(100 + i % 300, 20 + i % 80, 350000.0), repeat)
+    started = time.perf_counter()
+    writer.flush()
+    results['save_new_entry']['flush_ms'] = (time.perf_counter() - started) * 1000.0
+    return results
+
+
+def _request_bodies(count):
+    return [
+        json.dumps({'ternak_besar': 100 + i % 300, 'ternak_kecil': 20 + i % 80, 'persist': False})
+        for i in range(count)
+    ]
+
+
+def run_load(send, scenario, concurrency, total):
+    """
+    Tembakkan `total` request dari `concurrency` thread.
+
+    Args:
+        send (callable): send(method, path, body) -> status code, satu klien per thread
+        scenario (tuple): (method, path, bodies atau None)
+    """
+    method, path, bodies = scenario
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        local = []
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                break
+            body = bodies[index % len(bodies)] if bodies else None
+            started = time.perf_counter()
+            try:
+                status = send(method, path, body)
+            except OSError:
+                status = None
+            if status != 200:
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append((time.perf_counter() - started) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    if not latencies:
+        return {'requests': total, 'rps': 0.0, 'p50_ms': None, 'p99_ms': None, 'errors': errors[0]}
+    return {
+        'requests': total,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': _percentile(latencies, 0.5),
+        'p99_ms': _percentile(latencies, 0.99),
+        'errors': errors[0]
+    }
+
+
+def _test_client_sender(flask_app):
+    local = threading.local()
+
+    def send(method, path, body):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = flask_app.test_client()
+        response = client.open(path, method=method, data=body, content_type='application/json')
+        response.get_data()
+        return response.status_code
+    return send
+
+
+def _http_sender(port):
+    import http.client
+    local = threading.local()
+
+    def send(method, path, body):
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except OSError:
+            local.conn = None
+            raise
+    return send
+
+
+def run_http(processor, writer, transports, concurrency, total, tmp_dir):
+    """
+    Load test lewat app Flask asli (app.py) dengan riwayat sintetis:
+    DataProcessor dan PersistenceWriter milik modul app diganti milik benchmark.
+    Startup app memakai database dan salinan Excel di tmp_dir, sehingga
+    data/history.db asli tidak dibuat maupun diisi.
+    """
+    # Log request per baris tidak ikut diukur
+    logging.getLogger('lstm.requests').setLevel(logging.WARNING)
+    excel_path = os.path.join(tmp_dir, 'Modeldata.xlsx')
+    source_excel = os.path.join(BACKEND_DIR, 'data', 'Modeldata.xlsx')
+    if os.path.exists(source_excel):
+        shutil.copy(source_excel, excel_path)
+    os.environ['HISTORY_DB_PATH'] = os.path.join(tmp_dir, 'app-history.db')
+    os.environ['HISTORY_EXCEL_PATH'] = excel_path
+    import app as backend_app
+    backend_app.data_processor = processor
+    backend_app.persistence_writer = writer
+
+    scenarios = {
+        'POST /predict': ('POST', '/predict', _request_bodies(1000)),
+        'GET /revenue_history': ('GET', '/revenue_history?days=30', None)
+    }
+    results = {}
+    for transport in transports:
+        server = None
+        if transport == 'test_client':
+            send = _test_client_sender(backend_app.app)
+        else:
+            from werkzeug.serving import make_server
+            server = make_server('127.0.0.1', 0, backend_app.app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            send = _http_sender(server.server_port)
+        try:
+            for name, scenario in scenarios.items():
+                # Pemanasan singkat sebelum pengukuran
+                run_load(send, scenario, concurrency, concurrency * 5)
+                results[f'{transport} {name}'] = run_load(send, scenario, concurrency, total)
+        finally:
+            if server is not None:
+                server.shutdown()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def command_run(args):
+    import torch
+    np.random.seed(args.seed)
+    torch.manual_seed(args.seed)
+    model_loader = build_model_loader(args.threads)
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'torch': torch.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'torch_threads': torch.get_num_threads(),
+            'args': vars(args)
+        },
+        'micro': {},
+        'http': {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            processor, writer, load_seconds = build_processor(tmp, rows, model_loader.window_size, args.seed)
+            try:
+                results = run_micro(processor, writer, model_loader, args.repeat)
+                results['load'] = {'seconds': load_seconds}
+                report['micro'][str(rows)] = results
+                print(f"rows={rows:<8} load {load_seconds:7.2f}s  " + "  ".join(
+                    f"{name} {stats['median_us']:.1f}us" for name, stats in results.items() if 'median_us' in stats))
+            finally:
+                writer.close()
+
+        if args.transports:
+            rows = args.http_rows or args.sizes[-1]
+            processor, writer, _ = build_processor(tmp, rows, model_loader.window_size, args.seed)
+            try:
+                report['http'] = run_http(processor, writer, args.transports, args.concurrency, args.requests, tmp)
+                report['meta']['http_rows'] = rows
+            finally:
+                writer.close()
+            for name, result in report['http'].items():
+                p50 = f"{result['p50_ms']:.2f}" if result['p50_ms'] is not None else '-'
+                p99 = f"{result['p99_ms']:.2f}" if result['p99_ms'] is not None else '-'
+                print(f"{name:<36} {result['rps']:9.1f} rps  p50 {p50} ms  p99 {p99} ms  errors {result['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Hasil disimpan ke {args.output}")
+
+
+def compare_reports(baseline, current, threshold):
+    """
+    Bandingkan dua laporan run.
+
+    Returns:
+        list: (key, metrik, nilai lama, nilai baru, perubahan relatif, regresi?)
+    """
+    rows = []
+    for section, metrics in COMPARED_METRICS.items():
+        old_section, new_section = baseline.get(section, {}), current.get(section, {})
+        if section == 'micro':
+            pairs = [
+                (f'{size}/{name}', old_section[size][name], stats)
+                for size, results in new_section.items() if size in old_section
+                for name, stats in results.items() if name in old_section[size]
+            ]
+        else:
+            pairs = [(name, old_section[name], stats) for name, stats in new_section.items() if name in old_section]
+        for key, old, new in pairs:
+            for metric, higher_is_better in metrics:
+                before, after = old.get(metric), new.get(metric)
+                if not before or after is None or not math.isfinite(before):
+                    continue
+                change = (after - before) / before
+                regression = -change > threshold if higher_is_better else change > threshold
+                rows.append((f'{section}/{key}', metric, before, after, change, regression))
+    return rows
+
+
+def command_compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current, args.threshold)
+    print(f"{'benchmark':<44} {'metrik':<10} {'lama':>12} {'baru':>12} {'ubah':>8}")
+    for key, metric, before, after, change, regression in rows:
+        flag = '  REGRESI' if regression else ''
+        print(f"{key:<44} {metric:<10} {before:12.2f} {after:12.2f} {change:+7.1%}{flag}")
+
+    regressions = [row for row in rows if row[-1]]
+    print(f"{len(regressions)} regresi dari {len(rows)} metrik (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='jalankan benchmark dan simpan hasil ke JSON')
+    run.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='jumlah baris riwayat sintetis')
+    run.add_argument('--repeat', type=int, default=500, help='panggilan per microbenchmark')
+    run.add_argument('--transports', nargs='*', choices=['test_client', 'server'], default=['test_client', 'server'],
+                     help='load test HTTP (kosongkan untuk melewati)')
+    run.add_argument('--http-rows', type=int, help='ukuran riwayat untuk load test (default ukuran terbesar)')
+    run.add_argument('--concurrency', type=int, default=8)
+    run.add_argument('--requests', type=int, default=1000)
+    run.add_argument('--threads', type=int, help='thread intra-op torch (default dari config.json)')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--output', help='file JSON hasil')
+
+    compare = commands.add_parser('compare', help='bandingkan dua file hasil')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10, help='perubahan relatif yang dianggap regresi')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        command_run(args)
+    else:
+        sys.exit(command_compare(args))
+
+
+if __name__ == '__main__':
+    main()
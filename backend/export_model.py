@@ -0,0 +1,86 @@
+"""
+Export model_weights.pth ke TorchScript dan/atau ONNX sesuai shape di Models/config.json.
+
+Contoh:
+    python export_model.py                     # export keduanya
+    python export_model.py --format onnx
+Pilih engine dengan mengubah "engine" di Models/config.json
+(atau environment variable INFERENCE_ENGINE).
+"""
+import argparse
+import os
+import sys
+import torch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.forecaster import AdvancedLSTMForecaster
+from utils.inference_engines import (
+    EagerEngine, TorchScriptEngine, OnnxRuntimeEngine, check_parity,
+    TORCHSCRIPT_FILENAME, ONNX_FILENAME
+)
+from utils.model_loader import load_model_config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'Models')
+
+
+def build_model(config, weights_path):
+    model = AdvancedLSTMForecaster(
+        input_size=config['input_size'],
+        hidden_size=config['hidden_size'],
+        num_layers=config['num_layers'],
+        output_size=config['output_size'],
+        dropout_rate=config['dropout_rate']
+    )
+    model.load_state_dict(torch.load(weights_path, map_location='cpu'))
+    model.eval()
+    return model
+
+
+def export_torchscript(model, path):
+    scripted = torch.jit.script(model)
+    scripted.save(path)
+    return path
+
+
+def export_onnx(model, config, path):
+    example = torch.zeros(2, config['window_size'], config['input_size'])
+    torch.onnx.export(
+        model, (example,), path,
+        input_names=['input'],
+        output_names=['output'],
+        dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}},
+        opset_version=17,
+        dynamo=False
+    )
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--format', nargs='+', choices=['torchscript', 'onnx'], default=['torchscript', 'onnx'])
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    args = parser.parse_args()
+
+    config = load_model_config(os.path.join(args.models_dir, 'config.json'))
+    model = build_model(config, os.path.join(args.models_dir, 'model_weights.pth'))
+    eager = EagerEngine(model, torch.device('cpu'))
+
+    if 'torchscript' in args.format:
+        path = export_torchscript(model, os.path.join(args.models_dir, TORCHSCRIPT_FILENAME))
+        diff = check_parity(TorchScriptEngine(path, torch.device('cpu')), eager,
+                            config['window_size'], config['input_size'])
+        print(f"TorchScript disimpan ke {path} (max diff {diff:.2e})")
+
+    if 'onnx' in args.format:
+        path = export_onnx(model, config, os.path.join(args.models_dir, ONNX_FILENAME))
+        try:
+            diff = check_parity(OnnxRuntimeEngine(path), eager, config['window_size'], config['input_size'])
+            print(f"ONNX disimpan ke {path} (max diff {diff:.2e})")
+        except ImportError:
+            print(f"ONNX disimpan ke {path} (onnxruntime tidak terinstall, parity check dilewati)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Konfigurasi Gunicorn (dipakai oleh serve.py --mode wsgi).
+
+preload_app: app.py (torch, model, riwayat data) dimuat sekali di master lalu
+worker di-fork darinya, sehingga halaman memori tersebut dibagi copy-on-write
+dan tidak disalin per worker. Thread latar belakang dan koneksi SQLite dibuat
+ulang di setiap worker (lihat utils/forking.py). PRELOAD_APP=0 untuk menonaktifkan.
+"""
+import os
+
+preload_app = os.environ.get('PRELOAD_APP', '1') != '0'
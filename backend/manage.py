@@ -0,0 +1,209 @@
+"""
+Perintah maintenance offline (tidak dijalankan saat server boot).
+
+    python manage.py clean-data        # bersihkan dan format ulang data di storage
+    python manage.py import-excel      # import satu kali data/Modeldata.xlsx ke history.db
+    python manage.py bulk-import FILE  # backfill riwayat dari CSV/XLSX (dedupe per Tanggal)
+    python manage.py build-artifact    # tulis Models/model_artifact.pt untuk fast boot
+    python manage.py train             # latih ulang model dari riwayat, publish versi baru
+    python manage.py activate VERSI    # pindah (atau rollback) ke versi model tertentu
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'Models')
+MODEL_PATH = os.path.join(MODELS_DIR, 'model_weights.pth')
+MODEL_CONFIG_PATH = os.path.join(MODELS_DIR, 'config.json')
+MODEL_ARTIFACT_PATH = os.path.join(MODELS_DIR, 'model_artifact.pt')
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'Modeldata.xlsx')
+DB_PATH = os.path.join(BASE_DIR, 'data', 'history.db')
+
+
+def clean_data(args):
+    from utils.data_processor import DataProcessor
+    from utils.storage import SQLiteStorage
+
+    data_processor = DataProcessor(DATA_PATH, storage=SQLiteStorage(DB_PATH))
+    data_processor.clean_existing_data()
+    print(f"{len(data_processor.df)} baris setelah pembersihan")
+
+
+def import_excel(args):
+    from utils.storage import SQLiteStorage
+
+    imported = SQLiteStorage(DB_PATH).import_excel(args.excel)
+    if imported == 0:
+        print("Tidak ada yang diimport (sudah pernah diimport atau file tidak ada)")
+
+
+def bulk_import_data(args):
+    from utils.bulk_import import bulk_import
+    from utils.data_processor import DataProcessor
+    from utils.storage import SQLiteStorage
+
+    def progress(event):
+        if event['stage'] == 'merge':
+            print(f"  merge {event['done']}/{event['total']}")
+        else:
+            print(f"  {event['stage']}: " + ', '.join(f"{k}={v}" for k, v in event.items() if k != 'stage'))
+
+    data_processor = DataProcessor(DATA_PATH, storage=SQLiteStorage(DB_PATH))
+    summary = bulk_import(data_processor, args.file, args.file, replace=args.replace,
+                          chunk_size=args.chunk_size, progress=progress)
+    print(f"{summary['inserted']} baris ditambahkan, {summary['skipped']} dilewati, "
+          f"{summary['replaced']} entri lama diganti, {summary['invalid_dates']} tanggal tidak valid, "
+          f"{summary['duplicates_in_file']} duplikat di file")
+    print(f"{summary['rows']} baris dalam {summary['seconds']:.2f} detik "
+          f"({summary['rows_per_second']:.0f} baris/detik)")
+
+
+def _load_serving_model(registry):
+    """
+    Model yang sedang dilayani: versi aktif di registry, atau bobot bawaan
+    """
+    from utils.model_loader import LSTMModelLoader, load_model_config
+
+    version = registry.current()
+    if version is not None:
+        return LSTMModelLoader.from_version(registry, version)
+
+    config = load_model_config(MODEL_CONFIG_PATH)
+    return LSTMModelLoader(
+        MODEL_PATH,
+        input_size=config['input_size'],
+        hidden_size=config['hidden_size'],
+        num_layers=config['num_layers'],
+        output_size=config['output_size'],
+        dropout_rate=config['dropout_rate'],
+        window_size=config['window_size']
+    )
+
+
+def build_artifact(args):
+    from utils.model_registry import ModelRegistry
+
+    model_loader = _load_serving_model(ModelRegistry(MODELS_DIR))
+    path = model_loader.save_artifact(args.output)
+    print(f"Artifact versi {model_loader.model_version} disimpan ke {path}")
+
+
+def _export_engines(model, config, directory):
+    """
+    Export graph TorchScript dan ONNX dari bobot hasil training ke folder versi
+    """
+    from export_model import export_onnx, export_torchscript
+    from utils.inference_engines import ONNX_FILENAME, TORCHSCRIPT_FILENAME
+
+    model = model.cpu().eval()
+    export_torchscript(model, os.path.join(directory, TORCHSCRIPT_FILENAME))
+    try:
+        export_onnx(model, config, os.path.join(directory, ONNX_FILENAME))
+    except Exception as e:
+        # onnx bersifat opsional; engine onnxruntime akan kembali ke eager
+        print(f"Export ONNX dilewati: {e}")
+
+
+def train(args):
+    import copy
+    from utils.data_processor import DataProcessor
+    from utils.inference_engines import configure_threads
+    from utils.model_loader import load_model_config
+    from utils.model_registry import ModelRegistry
+    from utils.storage import SQLiteStorage
+    from utils.training import build_dataset, refit_scaler, train_model
+
+    configure_threads(args.threads)
+    registry = ModelRegistry(MODELS_DIR)
+    model_loader = _load_serving_model(registry)
+    values = DataProcessor(DATA_PATH, storage=SQLiteStorage(DB_PATH),
+                           window_size=model_loader.window_size).history_values()
+    print(f"Training dari {len(values)} baris riwayat (model awal: versi {model_loader.model_version})")
+
+    # Scaler ikut diversikan bersama bobot; refit hanya memproses baris baru
+    scaler = model_loader.scaler.copy()
+    if args.refit_scaler and refit_scaler(model_loader, scaler, values):
+        print(f"Scaler diperluas: min {scaler.data_min.tolist()}, max {scaler.data_max.tolist()}")
+    dataset = build_dataset(model_loader, values, scaler)
+
+    # Salinan yang bisa dilatih; model milik loader tetap untuk inference
+    model = copy.deepcopy(model_loader.model)
+    state_dict, metrics = train_model(
+        model, dataset,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.lr,
+        val_fraction=args.val_fraction,
+        num_workers=args.workers,
+        seed=args.seed
+    )
+    metrics.update({'base_version': model_loader.model_version, 'rows': len(values),
+                    'refit_scaler': args.refit_scaler})
+
+    config = load_model_config(MODEL_CONFIG_PATH)
+    config.update(model_loader.config)
+    model.load_state_dict(state_dict)
+    version = registry.publish(state_dict, config, scaler, metrics=metrics, activate=not args.no_activate,
+                               export=lambda directory: _export_engines(model, config, directory))
+    print(f"Versi {version} disimpan (val_loss terbaik {metrics['best_val_loss']:.6f}, "
+          f"{metrics['seconds']:.1f} detik)")
+    if args.no_activate:
+        print(f"Belum aktif; aktifkan dengan: python manage.py activate {version}")
+    else:
+        print("Versi aktif; server yang berjalan akan memuatnya otomatis")
+
+
+def activate(args):
+    from utils.model_registry import ModelRegistry
+
+    ModelRegistry(MODELS_DIR).activate(args.version)
+    print(f"Versi {args.version} aktif")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('clean-data', help='bersihkan data di storage').set_defaults(func=clean_data)
+
+    parser_import = subparsers.add_parser('import-excel', help='import satu kali dari Excel')
+    parser_import.add_argument('--excel', default=DATA_PATH)
+    parser_import.set_defaults(func=import_excel)
+
+    parser_bulk = subparsers.add_parser('bulk-import', help='backfill riwayat dari CSV/XLSX')
+    parser_bulk.add_argument('file', help='file .csv atau .xlsx')
+    parser_bulk.add_argument('--replace', action='store_true',
+                             help='ganti entri yang tanggalnya sudah ada (default: lewati)')
+    parser_bulk.add_argument('--chunk-size', type=int, default=5000)
+    parser_bulk.set_defaults(func=bulk_import_data)
+
+    parser_artifact = subparsers.add_parser('build-artifact', help='buat artifact fast boot')
+    parser_artifact.add_argument('--output', default=MODEL_ARTIFACT_PATH)
+    parser_artifact.set_defaults(func=build_artifact)
+
+    parser_train = subparsers.add_parser('train', help='latih ulang model dari riwayat')
+    parser_train.add_argument('--epochs', type=int, default=20)
+    parser_train.add_argument('--batch-size', type=int, default=64)
+    parser_train.add_argument('--lr', type=float, default=1e-3)
+    parser_train.add_argument('--val-fraction', type=float, default=0.1)
+    parser_train.add_argument('--workers', type=int, default=min(2, os.cpu_count() or 1), help='worker DataLoader')
+    parser_train.add_argument('--threads', type=int, default=None, help='torch intra-op threads')
+    parser_train.add_argument('--seed', type=int, default=42)
+    parser_train.add_argument('--refit-scaler', action='store_true',
+                              help='perluas min/max scaler dengan riwayat baru (running min/max)')
+    parser_train.add_argument('--no-activate', action='store_true', help='publish tanpa mengaktifkan')
+    parser_train.set_defaults(func=train)
+
+    parser_activate = subparsers.add_parser('activate', help='aktifkan versi model')
+    parser_activate.add_argument('version')
+    parser_activate.set_defaults(func=activate)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Launcher production untuk backend.
+
+    python serve.py --workers 2 --threads 8              # gunicorn gthread + app:app (default)
+    python serve.py --mode asgi --workers 2              # uvicorn + asgi:application
+
+Mode wsgi memuat app sekali di master (preload, lihat gunicorn.conf.py) lalu
+fork worker yang berbagi halaman memori model dan riwayat secara copy-on-write.
+Mode asgi: setiap worker uvicorn memuat model sendiri (bobot artifact di-mmap).
+Atur TORCH_NUM_THREADS agar workers x threads tidak melebihi jumlah core.
+
+Jumlah thread request per worker (--threads, atau ASGI_THREADS untuk asgi)
+diteruskan ke app sebagai WORKER_THREADS. Setiap klien /stream menahan satu
+thread selama tersambung, jadi STREAM_MAX_CLIENTS default-nya separuh jumlah
+itu; menaikkan STREAM_MAX_CLIENTS berarti menaikkan --threads juga.
+"""
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def serve_asgi(args):
+    import uvicorn
+    uvicorn.run(
+        'asgi:application',
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        log_level=args.log_level,
+        app_dir=BASE_DIR
+    )
+
+
+def serve_wsgi(args):
+    command = [
+        'gunicorn',
+        '--chdir', BASE_DIR,
+        '--config', os.path.join(BASE_DIR, 'gunicorn.conf.py'),
+        '--bind', f'{args.host}:{args.port}',
+        '--workers', str(args.workers),
+        '--threads', str(args.threads),
+        '--worker-class', 'gthread',
+        '--backlog', str(args.backlog),
+        '--log-level', args.log_level,
+        'app:app'
+    ]
+    os.environ['WORKER_THREADS'] = str(args.threads)
+    os.execvp(command[0], command)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['asgi', 'wsgi'], default='wsgi')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', 2)))
+    parser.add_argument('--threads', type=int, default=8, help='threads per worker (wsgi)')
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--log-level', default='warning')
+    args = parser.parse_args()
+
+    sys.path.insert(0, BASE_DIR)
+    if args.mode == 'asgi':
+        serve_asgi(args)
+    else:
+        serve_wsgi(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pandas as pd
+
+from .storage import COLUMNS
+
+IMPORT_FORMATS = ('.csv', '.xlsx')
+
+
+def read_import_file(source, filename):
+    """
+    Baca file backfill CSV/XLSX menjadi DataFrame mentah
+
+    Args:
+        source: Path atau file-like object
+        filename (str): Nama file asli (menentukan format dari ekstensinya)
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        df = pd.read_csv(source)
+    elif extension == '.xlsx':
+        df = pd.read_excel(source)
+    else:
+        raise ValueError(f"Format file harus salah satu dari: {', '.join(IMPORT_FORMATS)}")
+    df.columns = [str(col).strip() for col in df.columns]
+    missing = [col for col in COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom yang diperlukan tidak ada: {', '.join(missing)}")
+    return df
+
+
+def normalize_history(df):
+    """
+    Aturan pembersihan data riwayat (dipakai clean_existing_data dan bulk import):
+    baris dengan tanggal tidak valid dibuang, Tanggal diformat YYYY-MM-DD,
+    kolom numerik yang tidak valid menjadi 0
+
+    Returns:
+        pd.DataFrame: Data bersih dengan kolom COLUMNS
+    """
+    df = df[COLUMNS].copy()
+    df['Tanggal'] = pd.to_datetime(df['Tanggal'], errors='coerce')
+    df = df.dropna(subset=['Tanggal'])
+    df['Tanggal'] = df['Tanggal'].dt.strftime('%Y-%m-%d')
+    for col in COLUMNS[1:]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(float)
+    return df
+
+
+def bulk_import(data_processor, source, filename, replace=False, chunk_size=5000, progress=None):
+    """
+    Backfill riwayat dari file CSV/XLSX: validasi tervektorisasi, satu baris
+    per Tanggal (baris terakhir di file yang dipakai), lalu merge ke storage
+    dalam satu transaksi.
+
+    Args:
+        data_processor (DataProcessor): Tujuan import
+        source: Path atau file-like object
+        filename (str): Nama file asli
+        replace (bool): Ganti entri yang tanggalnya sudah ada (default: lewati)
+        chunk_size (int): Baris per potongan insert
+        progress (callable): progress(dict) untuk tahap parse, validate dan setiap potongan merge
+
+    Returns:
+        dict: Ringkasan import termasuk rows_per_second
+    """
+    report = progress or (lambda event: None)
+    started = time.perf_counter()
+
+    raw = read_import_file(source, filename)
+    report({'stage': 'parse', 'rows': len(raw), 'seconds': time.perf_counter() - started})
+
+    df = normalize_history(raw)
+    invalid_dates = len(raw) - len(df)
+    deduplicated = df.drop_duplicates('Tanggal', keep='last')
+    duplicates = len(df) - len(deduplicated)
+    report({'stage': 'validate', 'valid': len(deduplicated), 'invalid_dates': invalid_dates,
+            'duplicates_in_file': duplicates, 'seconds': time.perf_counter() - started})
+
+    merge_started = time.perf_counter()
+    result = data_processor.bulk_merge(
+        deduplicated.sort_values('Tanggal', kind='stable'),
+        replace=replace,
+        chunk_size=chunk_size,
+        progress=lambda done, total: report({'stage': 'merge', 'done': done, 'total': total})
+    )
+    merge_seconds = time.perf_counter() - merge_started
+    seconds = time.perf_counter() - started
+
+    summary = {
+        'stage': 'done',
+        'rows': len(raw),
+        'invalid_dates': invalid_dates,
+        'duplicates_in_file': duplicates,
+        **result,
+        'replace': replace,
+        'seconds': seconds,
+        'merge_seconds': merge_seconds,
+        'rows_per_second': len(raw) / seconds if seconds > 0 else 0.0
+    }
+    return summary
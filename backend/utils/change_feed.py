@@ -0,0 +1,70 @@
+import json
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+from .forking import register_after_fork
+
+
+class ChangeFeed:
+    def __init__(self, max_events=1000):
+        """
+        Antrian event perubahan data (baris riwayat baru, prediksi baru, reset)
+        untuk dikirim ke dashboard lewat /stream. Payload diserialisasi sekali
+        saat publish, sehingga jumlah klien tidak menambah biaya JSON.
+
+        Event diberi nomor urut per proses; `epoch` berganti setiap proses
+        (termasuk worker hasil fork) agar klien yang pindah worker tahu bahwa
+        nomor urutnya tidak berlaku lagi.
+
+        Args:
+            max_events (int): Jumlah event terakhir yang disimpan untuk klien
+                yang tertinggal atau tersambung ulang
+        """
+        self.max_events = max_events
+        self._events = deque(maxlen=max_events)
+        self._changed = threading.Condition()
+        self._seq = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        register_after_fork(self._after_fork)
+
+    def _after_fork(self):
+        self._events = deque(maxlen=self.max_events)
+        self._changed = threading.Condition()
+        self._seq = 0
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def publish(self, event, data):
+        """
+        Tambahkan event dan bangunkan semua klien yang menunggu
+
+        Args:
+            event (str): 'history', 'forecast' atau 'reset'
+            data: Payload yang bisa diserialisasi ke JSON
+        """
+        payload = json.dumps(data, default=str)
+        with self._changed:
+            self._seq += 1
+            self._events.append((self._seq, event, payload))
+            self._changed.notify_all()
+
+    def cursor(self):
+        with self._changed:
+            return self._seq
+
+    def wait(self, after, timeout=None):
+        """
+        Tunggu event setelah nomor urut `after`
+
+        Returns:
+            tuple: (events, cursor) dengan events list (seq, event, payload);
+                events None jika `after` sudah tidak ada di buffer (klien perlu reset)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq != after, timeout)
+            missed = self._seq - after
+            if missed == 0:
+                return [], after
+            if missed < 0 or missed > len(self._events):
+                return None, self._seq
+            return list(islice(self._events, len(self._events) - missed, None)), self._seq
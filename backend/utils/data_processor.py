@@ -1,147 +1,362 @@
 import pandas as pd
-import os
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+import threading
 import traceback
 import numpy as np
+from .storage import COLUMNS, ExcelStorage
+from .history_index import HistoryIndex
+from .change_feed import ChangeFeed
+from .rollups import RevenueRollups
+from .bulk_import import normalize_history
+from .metrics import stage
+from .persistence import StorageUnavailableError
+
+# Kolom fitur input model (urutan sesuai input LSTM)
+FEATURE_COLUMNS = COLUMNS[1:]
+REVENUE_COL = FEATURE_COLUMNS.index('Total Pendapatan')
+
+# Rentang hari yang payload riwayatnya disimpan per versi data
+PRECOMPUTED_WINDOWS = (7, 30, 90)
 
 class DataProcessor:
-    def __init__(self, excel_path):
+    def __init__(self, excel_path, storage=None, window_size=24, writer=None, flush_timeout=5.0):
         """
-        Initialize data processor with Excel file path
+        Initialize data processor with Excel file path and storage backend
         
         Args:
             excel_path (str): Path to the Excel file containing livestock data
+            storage: Storage backend (default: ExcelStorage pada excel_path)
+            window_size (int): Panjang window input model
+            writer (PersistenceWriter): Penulis latar belakang; jika None, tulis langsung ke storage
+            flush_timeout (float): Batas tunggu writer (flush/antrian penuh) sebelum
+                StorageUnavailableError, agar request tidak menggantung saat storage macet
         """
         self.excel_path = excel_path
-        self.df = None
+        self.storage = storage if storage is not None else ExcelStorage(excel_path)
+        self.writer = writer
+        self.flush_timeout = flush_timeout
+        # Melindungi state di memori (df, ring buffer, index) dari akses bersamaan
+        self._lock = threading.RLock()
+        # Menyerialkan penulis (save, sync, merge) tanpa mengunci pembaca saat
+        # save menunggu antrian writer; urutan kunci: _save_lock lalu _lock
+        self._save_lock = threading.Lock()
+        self.window_size = window_size
+        # Naik setiap kali data berubah (dipakai sebagai key cache prediksi)
+        self.version = 0
+        # DataFrame dibangun dari index hanya saat dibutuhkan (lihat property df)
+        self._df = None
+        self._df_version = None
+        self._index = HistoryIndex(len(FEATURE_COLUMNS))
+        self._history_payloads = {}
+        # Agregat harian/mingguan/bulanan/hari pasar untuk /revenue_summary
+        self._rollups = RevenueRollups()
+        # Notifikasi perubahan untuk /stream (lihat ChangeFeed)
+        self.changes = ChangeFeed()
+        # Posisi sinkronisasi dengan storage: id terakhir yang sudah diterapkan
+        # dan generation snapshot (berubah jika storage ditulis ulang)
+        self._last_id = None
+        self._generation = None
+        # Rentang id [awal, akhir] milik proses ini yang sudah ada di memori;
+        # dikunci terpisah karena diisi dari thread writer saat flush()
+        self._own_ids = []
+        self._own_lock = threading.Lock()
+        # Perubahan dari proses lain terdeteksi tetapi belum diterapkan
+        self._sync_pending = False
+        if self.writer is not None:
+            self.writer.add_listener(self._on_own_commit)
         self.load_data()
 
-    def create_empty_excel(self):
-        """
-        Membuat file Excel kosong dengan struktur kolom yang benar
-        """
-        try:
-            # Buat DataFrame kosong dengan kolom yang diperlukan
-            empty_df = pd.DataFrame(columns=[
-                'Tanggal',
-                'Ternak Besar Masuk',
-                'Ternak Kecil Masuk',
-                'Total Pendapatan'
-            ])
-            
-            # Simpan ke Excel
-            os.makedirs(os.path.dirname(self.excel_path), exist_ok=True)
-            empty_df.to_excel(self.excel_path, index=False)
-            return True
-        except Exception as e:
-            print(f"Error membuat file Excel: {e}")
-            return False
-
     def load_data(self):
         """
-        Load data dari file Excel
+        Load data dari storage backend
         """
+        with self._lock:
+            self._load_data()
+
+    def _load_data(self):
         try:
-            # Cek apakah file exists
-            if not os.path.exists(self.excel_path):
-                print("File Excel tidak ditemukan. Membuat file baru...")
-                if not self.create_empty_excel():
-                    raise Exception("Gagal membuat file Excel")
-            
-            self.df = pd.read_excel(self.excel_path)
-            self.df['Tanggal'] = pd.to_datetime(self.df['Tanggal'])
+            df, self._generation, self._last_id = self.storage.load_snapshot()
+            df['Tanggal'] = pd.to_datetime(df['Tanggal'])
             
             # Pastikan kolom yang diperlukan ada
-            required_columns = [
-                'Tanggal', 'Ternak Besar Masuk', 
-                'Ternak Kecil Masuk', 'Total Pendapatan'
-            ]
-            
-            for col in required_columns:
-                if col not in self.df.columns:
+            for col in COLUMNS:
+                if col not in df.columns:
                     raise ValueError(f"Kolom yang diperlukan tidak ada: {col}")
         
         except Exception as e:
             print(f"Error loading data: {e}")
             # Buat DataFrame kosong dengan struktur yang benar
-            self.df = pd.DataFrame(columns=[
-                'Tanggal', 'Ternak Besar Masuk',
-                'Ternak Kecil Masuk', 'Total Pendapatan'
-            ])
+            df = pd.DataFrame(columns=COLUMNS)
+            # Sinkronisasi berikutnya harus load penuh
+            self._generation = None
+        
+        self._prune_own_ids()
+        self._rebuild_index(df)
+        self._reset_window()
+        self.version += 1
+        self._df = df
+        self._df_version = self.version
+        # Riwayat dimuat ulang seluruhnya: klien /stream perlu mengambil ulang
+        self.changes.publish('reset', {'version': self.version})
+
+    @property
+    def df(self):
+        """
+        Riwayat sebagai DataFrame. Tidak disalin ulang di setiap penulisan;
+        dibangun dari index hanya jika data sudah berubah sejak terakhir dibaca.
+        """
+        with self._lock:
+            if self._df_version != self.version:
+                self._df = pd.DataFrame(self._index.values.copy(), columns=FEATURE_COLUMNS)
+                self._df.insert(0, 'Tanggal', self._index.dates.astype('datetime64[ns]'))
+                self._df_version = self.version
+            return self._df
+
+    def _rebuild_index(self, df):
+        """
+        Bangun ulang index tanggal bertipe dari DataFrame hasil load
+        """
+        self._history_payloads = {}
+        if df.empty:
+            self._index.rebuild([], np.empty((0, len(FEATURE_COLUMNS))))
+        else:
+            values = df[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce').fillna(0)
+            self._index.rebuild(df['Tanggal'], values.to_numpy(dtype=float))
+        self._rollups.rebuild(self._index.dates, self._index.values)
+
+    def _reset_window(self):
+        """
+        Isi ulang ring buffer window dari baris terakhir index
+        """
+        self._window = np.zeros((self.window_size, len(FEATURE_COLUMNS)))
+        self._window_pos = 0  # slot berikutnya yang ditulis (slot tertua jika penuh)
+        self._window_len = 0
+        tail = self._index.values[-self.window_size:]
+        self._window[:len(tail)] = tail
+        self._window_len = len(tail)
+        self._window_pos = len(tail) % self.window_size
+
+    def _push_window(self, row):
+        """
+        Tambahkan satu baris fitur ke ring buffer (O(1))
+        """
+        self._window[self._window_pos] = row
+        self._window_pos = (self._window_pos + 1) % self.window_size
+        self._window_len = min(self._window_len + 1, self.window_size)
+
+    def _ordered_window(self):
+        """
+        Baris-baris dalam ring buffer, urut dari yang terlama
+        """
+        if self._window_len < self.window_size:
+            return self._window[:self._window_len]
+        return np.concatenate((self._window[self._window_pos:], self._window[:self._window_pos]))
 
     def save_new_entry(self, ternak_besar, ternak_kecil, total_pendapatan):
         """
-        Save a new entry to the Excel file
+        Save a new entry to storage and update the in-memory data
         """
         try:
             # Get current date
             current_date = datetime.now().strftime('%Y-%m-%d')
             
             # Create new entry
-            new_entry = pd.DataFrame({
-                'Tanggal': [current_date],
-                'Ternak Besar Masuk': [float(ternak_besar)],
-                'Ternak Kecil Masuk': [float(ternak_kecil)],
-                'Total Pendapatan': [float(total_pendapatan)]
-            })
-            
-            # Load existing data
-            if os.path.exists(self.excel_path):
-                existing_data = pd.read_excel(self.excel_path)
-                # Pastikan format data konsisten
-                existing_data['Tanggal'] = pd.to_datetime(existing_data['Tanggal']).dt.strftime('%Y-%m-%d')
-                existing_data['Total Pendapatan'] = existing_data['Total Pendapatan'].astype(float)
-            else:
-                existing_data = pd.DataFrame(columns=new_entry.columns)
-            
-            # Concat dan sort
-            updated_data = pd.concat([existing_data, new_entry], ignore_index=True)
-            updated_data = updated_data.sort_values('Tanggal')
+            new_entry = {
+                'Tanggal': current_date,
+                'Ternak Besar Masuk': float(ternak_besar),
+                'Ternak Kecil Masuk': float(ternak_kecil),
+                'Total Pendapatan': float(total_pendapatan)
+            }
             
-            # Simpan ke Excel
-            updated_data.to_excel(self.excel_path, index=False)
+            features = [new_entry[col] for col in FEATURE_COLUMNS]
             
-            # Reload data
-            self.load_data()
-            print("Data berhasil disimpan")
+            with stage('save_new_entry'), self._save_lock:
+                # Antrikan ke writer lebih dulu (urutan sama dengan urutan di memori),
+                # atau append langsung (O(1) untuk SQLiteStorage): jika storage macet,
+                # memori tidak berubah dan pemanggil mendapat StorageUnavailableError.
+                # Hanya _save_lock yang dipegang selama menunggu, pembaca tetap jalan.
+                if self.writer is not None:
+                    self.writer.submit([new_entry], timeout=self.flush_timeout)
+                else:
+                    self._on_own_commit([new_entry], self.storage.append([new_entry]))
+                
+                with self._lock:
+                    # Update data di memori tanpa reload (tanpa menyalin riwayat)
+                    pos = self._index.insert(current_date, features)
+                    if pos == len(self._index) - 1:
+                        self._push_window(features)
+                    else:
+                        # Ada entri bertanggal setelah hari ini: isi ulang dari ekor index
+                        self._reset_window()
+                    self._rollups.add(current_date, features)
+                    self.version += 1
+                    self.changes.publish('history', {
+                        'Tanggal': current_date,
+                        'Total_Pendapatan': new_entry['Total Pendapatan']
+                    })
             return True
             
+        except StorageUnavailableError:
+            raise
         except Exception as e:
             print(f"Error saving entry: {e}")
             traceback.print_exc()  # Tambahkan ini untuk debug
             return False
 
+    def export_snapshot(self, start=None, end=None, chunk_size=5000):
+        """
+        Snapshot riwayat untuk export langsung dari storage. Antrian penulisan
+        di-flush dulu agar entry yang sudah diterima ikut terhitung.
+
+        Args:
+            start (str): Tanggal awal 'YYYY-MM-DD' (inklusif) atau None
+            end (str): Tanggal akhir 'YYYY-MM-DD' (inklusif) atau None
+            chunk_size (int): Jumlah baris per potongan
+
+        Returns:
+            tuple: (penanda isi untuk ETag, generator potongan DataFrame dari
+                snapshot yang sama; panggil close() jika tidak dibaca habis)
+        """
+        self._drain_writer()
+        chunks = self.storage.iter_snapshot(start=start, end=end, chunk_size=chunk_size)
+        return next(chunks), chunks
+
+    def _on_own_commit(self, rows, id_range):
+        """
+        Catat rentang id entri milik proses ini yang baru di-commit (dipanggil
+        writer sebelum flush() selesai), agar tidak diterapkan dua kali saat sinkronisasi
+        """
+        if id_range is None:
+            return
+        with self._own_lock:
+            if self._own_ids and self._own_ids[-1][1] + 1 == id_range[0]:
+                self._own_ids[-1][1] = id_range[1]
+            else:
+                self._own_ids.append(list(id_range))
+
+    def _prune_own_ids(self):
+        with self._own_lock:
+            if self._last_id is None:
+                self._own_ids = []
+            else:
+                self._own_ids = [ids for ids in self._own_ids if ids[1] > self._last_id]
+
+    def _drain_writer(self):
+        """
+        Tunggu antrian writer kosong, paling lama flush_timeout detik
+        """
+        if self.writer is not None and not self.writer.flush(self.flush_timeout):
+            raise StorageUnavailableError("Storage belum bisa ditulis, coba lagi")
+
+    def sync_external_changes(self):
+        """
+        Terapkan entri yang ditulis proses lain (worker Gunicorn lain) ke storage.
+        Tabel append-only, jadi cukup baris dengan id setelah id terakhir yang
+        diterapkan; load penuh hanya jika storage ditulis ulang (rewrite/merge).
+        
+        Antrian writer di-flush di luar lock (dengan batas waktu) agar storage
+        yang macet tidak menahan request lain; raise StorageUnavailableError
+        jika antrian tidak kosong dalam flush_timeout.
+        
+        Returns:
+            bool: True jika ada perubahan dari proses lain yang diterapkan
+        """
+        if not self.storage.has_external_changes() and not self._sync_pending:
+            return False
+        self._sync_pending = True
+        self._drain_writer()
+        with self._save_lock, self._lock:
+            if self.writer is not None and not self.writer.idle():
+                # Entri baru masuk antrian setelah flush: rentang id-nya belum
+                # tercatat, jadi penerapan ditunda ke pemanggilan berikutnya
+                return False
+            rows = self.storage.entries_after(self._last_id, self._generation)
+            if rows is None:
+                self._load_data()
+            else:
+                self._apply_external_rows(rows)
+            self._sync_pending = False
+        return True
+
+    def _apply_external_rows(self, rows):
+        """
+        Sisipkan baris (id, tanggal, ...fitur) dari storage ke index, rollup dan
+        ring buffer, melewati baris milik proses ini yang sudah ada di memori
+        """
+        with self._own_lock:
+            own_ids = [tuple(ids) for ids in self._own_ids]
+        applied = []
+        reset_window = False
+        for row_id, tanggal, *features in rows:
+            if any(first <= row_id <= last for first, last in own_ids):
+                continue
+            pos = self._index.insert(tanggal, features)
+            self._rollups.add(tanggal, features)
+            if pos == len(self._index) - 1:
+                self._push_window(features)
+            else:
+                # Tanggal lampau: window tidak lagi sama dengan ekor index
+                reset_window = True
+            applied.append({'Tanggal': tanggal, 'Total_Pendapatan': features[REVENUE_COL]})
+        if rows:
+            self._last_id = max(self._last_id, rows[-1][0])
+            self._prune_own_ids()
+        if reset_window:
+            self._reset_window()
+        if applied:
+            self.version += 1
+            for record in applied:
+                self.changes.publish('history', record)
+
+    def get_revenue_history_records(self, days=30):
+        """
+        Get revenue history for the last `days` days as JSON-ready records.
+        Binary search pada index terurut: O(log n + k), tanpa mengubah self.df.
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+        # Tanggal (tengah malam) >= cutoff, sama seperti filter DataFrame sebelumnya
+        start = cutoff.date() if cutoff.time() == time(0) else cutoff.date() + timedelta(days=1)
+        
+        with self._lock:
+            if days in PRECOMPUTED_WINDOWS:
+                cached = self._history_payloads.get(days)
+                if cached is not None and cached[:2] == (self.version, start):
+                    return cached[2]
+            
+            lo, hi = self._index.range_slice(start=start)
+            dates = np.datetime_as_string(self._index.dates[lo:hi], unit='D').tolist()
+            revenues = self._index.values[lo:hi, REVENUE_COL].tolist()
+            version = self.version
+        
+        records = [
+            {'Tanggal': tanggal, 'Total_Pendapatan': pendapatan}
+            for tanggal, pendapatan in zip(dates, revenues)
+        ]
+        
+        if days in PRECOMPUTED_WINDOWS:
+            with self._lock:
+                self._history_payloads[days] = (version, start, records)
+        return records
+
+    def get_revenue_summary(self, granularity, target_harian, start=None, end=None):
+        """
+        Ringkasan pendapatan per bucket dari rollup inkremental: O(jumlah bucket)
+
+        Args:
+            granularity (str): daily, weekly, monthly atau market_day
+            target_harian (float): Target pendapatan harian untuk perhitungan defisit
+            start, end (str): Rentang tanggal inklusif YYYY-MM-DD (opsional)
+        """
+        with self._lock:
+            return self._rollups.summary(granularity, target_harian, start=start, end=end)
+
     def get_revenue_history(self, days=30):
         """
         Get revenue history for specified number of days
         """
         try:
-            # Ensure data is loaded and sorted
-            if self.df is None or self.df.empty:
-                print("Data kosong, mengembalikan DataFrame kosong")
-                return pd.DataFrame(columns=['Tanggal', 'Total_Pendapatan'])
-            
-            # Convert and clean data
-            self.df['Tanggal'] = pd.to_datetime(self.df['Tanggal'])
-            self.df['Total Pendapatan'] = pd.to_numeric(self.df['Total Pendapatan'], errors='coerce').fillna(0)
-            
-            # Sort and filter data
-            self.df = self.df.sort_values('Tanggal', ascending=True)
-            cutoff_date = datetime.now() - timedelta(days=days)
-            recent_data = self.df[self.df['Tanggal'] >= cutoff_date].copy()
-            
-            if recent_data.empty:
-                print("Tidak ada data dalam rentang waktu yang diminta")
-                return pd.DataFrame(columns=['Tanggal', 'Total_Pendapatan'])
-            
-            # Format data untuk response
-            result = pd.DataFrame({
-                'Tanggal': recent_data['Tanggal'].dt.strftime('%Y-%m-%d'),
-                'Total_Pendapatan': recent_data['Total Pendapatan']
-            })
-            
-            print("Data yang dikirim:", result.to_dict('records'))
-            return result
+            records = self.get_revenue_history_records(days)
+            return pd.DataFrame(records, columns=['Tanggal', 'Total_Pendapatan'])
             
         except Exception as e:
             print(f"Error retrieving revenue history: {e}")
@@ -150,67 +365,79 @@ class DataProcessor:
 
     def clean_existing_data(self):
         """
-        Membersihkan dan memformat ulang data Excel yang ada
+        Membersihkan dan memformat ulang data yang ada di storage
         """
         try:
-            if os.path.exists(self.excel_path):
-                # Baca data existing
-                df = pd.read_excel(self.excel_path)
-                
-                # Convert tanggal ke format yang benar
-                df['Tanggal'] = pd.to_datetime(df['Tanggal'], errors='coerce')
-                
-                # Hapus baris dengan tanggal invalid
-                df = df.dropna(subset=['Tanggal'])
-                
-                # Format ulang kolom
-                df['Tanggal'] = df['Tanggal'].dt.strftime('%Y-%m-%d')
-                df['Ternak Besar Masuk'] = pd.to_numeric(df['Ternak Besar Masuk'], errors='coerce').fillna(0)
-                df['Ternak Kecil Masuk'] = pd.to_numeric(df['Ternak Kecil Masuk'], errors='coerce').fillna(0)
-                df['Total Pendapatan'] = pd.to_numeric(df['Total Pendapatan'], errors='coerce').fillna(0)
-                
-                # Simpan kembali data yang sudah bersih
-                df.to_excel(self.excel_path, index=False)
-                print("Data Excel berhasil dibersihkan")
+            self._drain_writer()
+            # Baca data existing, buang tanggal invalid dan format ulang kolom
+            df = normalize_history(self.storage.load())
+            
+            # Simpan kembali data yang sudah bersih
+            with self._save_lock, self._lock:
+                self._drain_writer()
+                self.storage.rewrite(df)
+                self._load_data()
+            print("Data berhasil dibersihkan")
                 
         except Exception as e:
             print(f"Error membersihkan data: {e}")
 
-    def get_sequence_data(self, ternak_besar, ternak_kecil, window_size=24):
+    def bulk_merge(self, df, replace=False, chunk_size=5000, progress=None):
+        """
+        Merge data ter-normalisasi ke storage dalam satu transaksi lalu muat ulang
+        index di memori (lihat utils/bulk_import.py). Entri yang masih di antrian
+        writer ditulis dulu (StorageUnavailableError jika tidak bisa dalam
+        flush_timeout); request lain menunggu selama merge berlangsung.
+        """
+        self._drain_writer()
+        with self._save_lock, self._lock:
+            # Biasanya langsung kembali; entri yang masuk setelah flush di atas
+            # harus tertulis sebelum index dimuat ulang dari storage
+            self._drain_writer()
+            result = self.storage.merge(df, replace=replace, chunk_size=chunk_size, progress=progress)
+            self._load_data()
+        return result
+
+    def history_values(self):
+        """
+        Salinan riwayat (N, 3) terurut tanggal: Ternak Besar, Ternak Kecil, Total Pendapatan
+        """
+        with self._lock:
+            return self._index.values.copy()
+
+    def get_versioned_sequence(self, ternak_besar, ternak_kecil):
+        """
+        Sequence data beserta versi data yang dipakai membangunnya (konsisten satu sama lain)
+        """
+        with stage('get_sequence_data'), self._lock:
+            return self.version, self.get_sequence_data(ternak_besar, ternak_kecil)
+
+    def get_sequence_data(self, ternak_besar, ternak_kecil, window_size=None):
         """
         Get sequence data for model input
         """
         try:
-            if self.df is None or self.df.empty:
+            window_size = window_size or self.window_size
+            with self._lock:
+                if window_size == self.window_size:
+                    history = self._ordered_window().copy()
+                else:
+                    history = self._index.values[-window_size:].copy()
+            
+            if len(history) == 0:
                 # If no historical data, create sequence with zeros
-                sequence = np.zeros((window_size, 3))
-                for i in range(window_size):
-                    sequence[i] = [ternak_besar, ternak_kecil, 0]
+                sequence = np.empty((window_size, 3))
+                sequence[:] = [ternak_besar, ternak_kecil, 0]
                 return sequence
             
-            # Get last window_size records
-            recent_data = self.df.tail(window_size).copy()
-            
-            if len(recent_data) < window_size:
-                # Pad with zeros if not enough historical data
-                padding = pd.DataFrame({
-                    'Ternak Besar Masuk': [0] * (window_size - len(recent_data)),
-                    'Ternak Kecil Masuk': [0] * (window_size - len(recent_data)),
-                    'Total Pendapatan': [0] * (window_size - len(recent_data))
-                })
-                recent_data = pd.concat([padding, recent_data], ignore_index=True)
-            
+            # Pad with zeros if not enough historical data
             sequence = np.zeros((window_size, 3))
-            for i in range(window_size):
-                sequence[i] = [
-                    ternak_besar if i == window_size-1 else recent_data.iloc[i]['Ternak Besar Masuk'],
-                    ternak_kecil if i == window_size-1 else recent_data.iloc[i]['Ternak Kecil Masuk'],
-                    recent_data.iloc[i]['Total Pendapatan']
-                ]
+            sequence[window_size - len(history):] = history
+            sequence[-1, :2] = [ternak_besar, ternak_kecil]
             
             return sequence
             
         except Exception as e:
             print(f"Error getting sequence data: {e}")
             traceback.print_exc()
-            return None
\ No newline at end of file
+            return None
@@ -0,0 +1,150 @@
+import os
+import tempfile
+import pandas as pd
+from .storage import COLUMNS
+
+# format -> (mimetype, ekstensi file)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx')
+}
+
+# Ukuran blok saat mengalirkan file sementara (xlsx)
+FILE_BLOCK_SIZE = 64 * 1024
+
+
+class _ChunkSink:
+    """
+    File-like minimal untuk writer pyarrow: menampung byte yang ditulis
+    sampai diambil dengan drain(), sehingga bisa dialirkan per potongan.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _normalize(chunk):
+    chunk = chunk[COLUMNS].copy()
+    chunk['Tanggal'] = pd.to_datetime(chunk['Tanggal'], errors='coerce')
+    for col in COLUMNS[1:]:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype('float64')
+    return chunk
+
+
+def _stream_csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield _normalize(chunk).to_csv(index=False, header=header, date_format='%Y-%m-%d').encode('utf-8')
+        header = False
+    if header:
+        yield (','.join(COLUMNS) + '\n').encode('utf-8')
+
+
+def _arrow_schema():
+    import pyarrow as pa
+    return pa.schema(
+        [pa.field('Tanggal', pa.date32())] + [pa.field(col, pa.float64()) for col in COLUMNS[1:]]
+    )
+
+
+def _to_table(chunk, schema):
+    import pyarrow as pa
+    chunk = _normalize(chunk)
+    chunk['Tanggal'] = chunk['Tanggal'].dt.date
+    return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def _stream_parquet(chunks):
+    import pyarrow.parquet as pq
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    # Setiap potongan menjadi satu row group; footer ditulis saat close
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(_to_table(chunk, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _stream_arrow(chunks):
+    import pyarrow as pa
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(_to_table(chunk, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _stream_xlsx(chunks):
+    # xlsx adalah arsip zip yang baru valid setelah selesai ditulis: baris
+    # ditulis dengan workbook write-only (memori konstan) ke file sementara,
+    # lalu file tersebut dialirkan per blok
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(COLUMNS)
+    for chunk in chunks:
+        for row in _normalize(chunk).itertuples(index=False):
+            sheet.append([row[0].to_pydatetime() if not pd.isna(row[0]) else None, *row[1:]])
+
+    fd, tmp_path = tempfile.mkstemp(suffix='.xlsx')
+    try:
+        os.close(fd)
+        workbook.save(tmp_path)
+        with open(tmp_path, 'rb') as f:
+            while True:
+                block = f.read(FILE_BLOCK_SIZE)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.remove(tmp_path)
+
+
+_STREAMERS = {
+    'csv': _stream_csv,
+    'parquet': _stream_parquet,
+    'arrow': _stream_arrow,
+    'xlsx': _stream_xlsx
+}
+
+
+def stream_export(chunks, export_format):
+    """
+    Ubah iterator potongan DataFrame menjadi iterator bytes dalam format tujuan
+
+    Args:
+        chunks (iterable): Potongan DataFrame dengan kolom COLUMNS
+        export_format (str): Salah satu kunci EXPORT_FORMATS
+    """
+    if export_format not in _STREAMERS:
+        raise ValueError(f"Format export tidak dikenal: {export_format}")
+    for data in _STREAMERS[export_format](chunks):
+        if data:
+            yield data
@@ -0,0 +1,71 @@
+import copy
+from typing import Optional, Tuple
+
+import torch
+from torch import nn
+
+
+class AdvancedLSTMForecaster(nn.Module):
+    def __init__(self, input_size, hidden_size, num_layers, output_size, dropout_rate=0.2):
+        """
+        LSTM encoder + fully connected head yang memprediksi output_size langkah sekaligus
+
+        Args:
+            input_size (int): Number of input features
+            hidden_size (int): Number of LSTM hidden units
+            num_layers (int): Number of LSTM layers
+            output_size (int): Number of output timesteps
+            dropout_rate (float): Dropout rate for regularization
+        """
+        super(AdvancedLSTMForecaster, self).__init__()
+        self.hidden_size = hidden_size
+        self.num_layers = num_layers
+        self.lstm = nn.LSTM(input_size=input_size,
+                            hidden_size=hidden_size,
+                            num_layers=num_layers,
+                            batch_first=True,
+                            dropout=dropout_rate)
+        self.fc = nn.Sequential(
+            nn.Linear(hidden_size, 128),
+            nn.BatchNorm1d(128),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(128, 64),
+            nn.BatchNorm1d(64),
+            nn.ReLU(),
+            nn.Dropout(dropout_rate),
+            nn.Linear(64, output_size)
+        )
+
+    def encode(self, x, state: Optional[Tuple[torch.Tensor, torch.Tensor]] = None):
+        """
+        Jalankan LSTM atas x dan kembalikan output langkah terakhir beserta
+        state (h, c), sehingga langkah berikutnya bisa dilanjutkan tanpa
+        meng-encode ulang seluruh window
+        """
+        if state is None:
+            h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
+            c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
+            state = (h0, c0)
+        out, state = self.lstm(x, state)
+        return out[:, -1, :], state
+
+    def forward(self, x):
+        out, _ = self.encode(x)
+        return self.fc(out)
+
+
+def mc_dropout_view(model):
+    """
+    Salinan modul yang berbagi parameter dan buffer dengan `model`, dengan
+    dropout (nn.Dropout dan dropout antar layer nn.LSTM) aktif dan BatchNorm1d
+    tetap eval. Mode training tidak diubah pada model asli, sehingga aman
+    dipakai bersamaan dengan inference biasa di thread lain.
+    """
+    memo = {id(tensor): tensor for tensor in list(model.parameters()) + list(model.buffers())}
+    view = copy.deepcopy(model, memo)
+    view.eval()
+    for module in view.modules():
+        if isinstance(module, (nn.Dropout, nn.LSTM)):
+            module.train()
+    return view
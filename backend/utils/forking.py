@@ -0,0 +1,21 @@
+import os
+import weakref
+
+
+def register_after_fork(method):
+    """
+    Panggil bound method `method` di proses child setelah fork (misalnya worker
+    Gunicorn dengan preload_app). Thread, antrian dan koneksi database tidak
+    ikut tersalin dengan benar ke child, jadi objek perlu membuatnya ulang.
+    Referensi lemah: objek yang sudah tidak dipakai tidak ditahan di memori.
+    """
+    if not hasattr(os, 'register_at_fork'):
+        return
+    ref = weakref.WeakMethod(method)
+
+    def _after_fork():
+        bound = ref()
+        if bound is not None:
+            bound()
+
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+
+class HistoryIndex:
+    def __init__(self, n_features=3, capacity=1024):
+        """
+        Index riwayat yang selalu terurut berdasarkan tanggal, disimpan sebagai
+        array NumPy bertipe (datetime64[D] + float) dengan kapasitas yang tumbuh
+        berlipat ganda sehingga append bersifat amortized O(1).
+
+        Args:
+            n_features (int): Jumlah kolom numerik per baris
+            capacity (int): Kapasitas awal
+        """
+        self.n_features = n_features
+        self._dates = np.empty(capacity, dtype='datetime64[D]')
+        self._values = np.empty((capacity, n_features))
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dates(self):
+        return self._dates[:self._size]
+
+    @property
+    def values(self):
+        return self._values[:self._size]
+
+    def rebuild(self, dates, values):
+        """
+        Bangun ulang index dari array tanggal dan nilai (urutan bebas)
+        """
+        dates = pd.to_datetime(pd.Series(dates), errors='coerce')
+        valid = dates.notna().to_numpy()
+        dates = dates[valid].to_numpy().astype('datetime64[D]')
+        values = np.asarray(values, dtype=float)[valid]
+        order = np.argsort(dates, kind='stable')
+        self._size = 0
+        self._reserve(len(dates))
+        self._dates[:len(dates)] = dates[order]
+        self._values[:len(dates)] = values[order]
+        self._size = len(dates)
+
+    def _reserve(self, size):
+        if size <= len(self._dates):
+            return
+        capacity = max(size, 2 * len(self._dates))
+        dates = np.empty(capacity, dtype='datetime64[D]')
+        values = np.empty((capacity, self.n_features))
+        dates[:self._size] = self._dates[:self._size]
+        values[:self._size] = self._values[:self._size]
+        self._dates, self._values = dates, values
+
+    def insert(self, date, row):
+        """
+        Sisipkan satu baris, tetap terurut (setelah baris lain bertanggal sama).
+        O(1) untuk tanggal terbaru, O(n) hanya untuk tanggal lampau.
+
+        Returns:
+            int: Posisi baris di index
+        """
+        date = np.datetime64(pd.Timestamp(date).date(), 'D')
+        self._reserve(self._size + 1)
+        pos = int(np.searchsorted(self.dates, date, side='right'))
+        if pos < self._size:
+            self._dates[pos + 1:self._size + 1] = self._dates[pos:self._size]
+            self._values[pos + 1:self._size + 1] = self._values[pos:self._size]
+        self._dates[pos] = date
+        self._values[pos] = row
+        self._size += 1
+        return pos
+
+    def range_slice(self, start=None, end=None):
+        """
+        Batas index [lo, hi) untuk start <= tanggal <= end via binary search
+        """
+        dates = self.dates
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        hi = self._size if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        return lo, max(lo, hi)
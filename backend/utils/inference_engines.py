@@ -0,0 +1,137 @@
+import copy
+import os
+import logging
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ('eager', 'quantized', 'torchscript', 'onnxruntime')
+
+# Toleransi parity terhadap eager; int8 wajar bergeser lebih jauh dari fp32
+PARITY_ATOL = {'quantized': 1e-2}
+
+# Nama file artifact hasil export_model.py (di folder Models)
+TORCHSCRIPT_FILENAME = 'model_scripted.pt'
+ONNX_FILENAME = 'model.onnx'
+
+
+class EagerEngine:
+    name = 'eager'
+
+    def __init__(self, model, device):
+        """
+        Inference langsung dengan modul PyTorch (mode eval)
+        """
+        self.model = model
+        self.device = device
+
+    def __call__(self, batch):
+        model_input = torch.as_tensor(np.asarray(batch, dtype=np.float32)).to(self.device)
+        with torch.no_grad():
+            return self.model(model_input).cpu().numpy()
+
+
+class QuantizedEngine(EagerEngine):
+    name = 'quantized'
+
+    def __init__(self, model):
+        """
+        Inference CPU dengan dynamic int8 quantization pada nn.LSTM dan nn.Linear
+        (bobot int8, aktivasi dikuantisasi saat runtime)
+        """
+        from torch import nn
+        quantized = torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(model).to('cpu'), {nn.LSTM, nn.Linear}, dtype=torch.qint8
+        )
+        quantized.eval()
+        super().__init__(quantized, torch.device('cpu'))
+
+
+class TorchScriptEngine:
+    name = 'torchscript'
+
+    def __init__(self, path, device):
+        """
+        Inference dengan modul TorchScript hasil export
+        """
+        self.device = device
+        self.module = torch.jit.load(path, map_location=device)
+        self.module.eval()
+
+    def __call__(self, batch):
+        model_input = torch.as_tensor(np.asarray(batch, dtype=np.float32)).to(self.device)
+        with torch.no_grad():
+            return self.module(model_input).cpu().numpy()
+
+
+class OnnxRuntimeEngine:
+    name = 'onnxruntime'
+
+    def __init__(self, path, num_threads=None):
+        """
+        Inference dengan ONNX Runtime (CPU)
+        """
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch):
+        model_input = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.input_name: model_input})[0]
+
+
+def create_engine(name, model, device, models_dir, num_threads=None):
+    """
+    Buat inference engine sesuai nama di config
+
+    Args:
+        name (str): 'eager', 'quantized', 'torchscript' atau 'onnxruntime'
+        model (nn.Module): Model eager yang sudah memuat bobot
+        device (torch.device): Device inference
+        models_dir (str): Folder berisi artifact hasil export
+        num_threads (int): Jumlah thread intra-op (khusus onnxruntime)
+    """
+    if name == 'eager':
+        return EagerEngine(model, device)
+    if name == 'quantized':
+        return QuantizedEngine(model)
+    if name == 'torchscript':
+        return TorchScriptEngine(os.path.join(models_dir, TORCHSCRIPT_FILENAME), device)
+    if name == 'onnxruntime':
+        return OnnxRuntimeEngine(os.path.join(models_dir, ONNX_FILENAME), num_threads)
+    raise ValueError(f"Inference engine tidak dikenal: {name} (pilihan: {', '.join(ENGINES)})")
+
+
+def configure_threads(num_threads=None, num_interop_threads=None):
+    """
+    Atur thread pool PyTorch per proses worker agar tidak berebut core
+    dengan worker Flask/Gunicorn lain. Panggil sebelum inference pertama.
+    """
+    if num_threads:
+        torch.set_num_threads(int(num_threads))
+    if num_interop_threads:
+        try:
+            torch.set_num_interop_threads(int(num_interop_threads))
+        except RuntimeError as e:
+            # Hanya bisa diset sekali dan sebelum ada pekerjaan paralel
+            logger.warning(f"Interop threads tidak diubah: {str(e)}")
+    logger.info(f"Torch threads: intra-op={torch.get_num_threads()}, interop={torch.get_num_interop_threads()}")
+
+
+def check_parity(engine, reference, window_size, input_size, batch_size=4, atol=1e-4):
+    """
+    Bandingkan output engine dengan engine referensi (eager) pada input acak
+
+    Returns:
+        float: Selisih absolut maksimum
+    """
+    rng = np.random.default_rng(0)
+    sample = rng.uniform(0, 1, (batch_size, window_size, input_size)).astype(np.float32)
+    max_diff = float(np.max(np.abs(engine(sample) - reference(sample))))
+    if max_diff > atol:
+        raise ValueError(f"Parity check gagal untuk engine {engine.name}: max diff {max_diff:.2e} > {atol:.0e}")
+    return max_diff
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+import logging
+import numpy as np
+from .forking import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Batas atas bucket histogram waktu tunggu (ms)
+WAIT_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100]
+
+
+class _PendingRequest:
+    __slots__ = ('sample', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, sample):
+        self.sample = sample
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class InferenceScheduler:
+    def __init__(self, forward_fn, max_batch_size=32, max_wait_ms=3.0, max_queue_size=1024):
+        """
+        Micro-batching scheduler: mengumpulkan request inference yang datang
+        bersamaan lalu menjalankannya dalam satu forward pass.
+
+        Args:
+            forward_fn (callable): Fungsi (B, window, features) -> (B, output_size)
+            max_batch_size (int): Jumlah maksimum sample dalam satu batch
+            max_wait_ms (float): Waktu tunggu maksimum untuk mengisi batch
+            max_queue_size (int): Kapasitas antrian request
+        """
+        self.forward_fn = forward_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue_size = max_queue_size
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = {}
+        self._wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._requests = 0
+        self._batches = 0
+        self._running = True
+        self._start_worker()
+        register_after_fork(self._after_fork)
+
+    def _start_worker(self):
+        self._worker = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+        self._worker.start()
+
+    def _after_fork(self):
+        # Thread worker tidak ikut ke proses child: buat ulang antrian dan thread
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._stats_lock = threading.Lock()
+        if self._running:
+            self._start_worker()
+
+    def submit(self, sample, timeout=None):
+        """
+        Kirim satu sample (window, features) dan tunggu hasil baris miliknya
+        """
+        if not self._running:
+            raise RuntimeError("Inference scheduler sudah dihentikan")
+        request = _PendingRequest(np.asarray(sample, dtype=np.float32))
+        self._queue.put(request, timeout=timeout)
+        if not request.done.wait(timeout):
+            raise TimeoutError("Inference scheduler timeout")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            started = time.perf_counter()
+            try:
+                outputs = self.forward_fn(np.stack([req.sample for req in batch]))
+                for req, row in zip(batch, outputs):
+                    req.result = row
+            except Exception as e:
+                logger.error(f"Error in batched inference: {str(e)}")
+                for req in batch:
+                    req.error = e
+            finally:
+                self._record(batch, started)
+                for req in batch:
+                    req.done.set()
+
+    def _record(self, batch, started):
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+            for req in batch:
+                wait_ms = (started - req.enqueued_at) * 1000.0
+                self._wait_total_ms += wait_ms
+                self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+                for i, bound in enumerate(WAIT_BUCKETS_MS):
+                    if wait_ms <= bound:
+                        self._wait_counts[i] += 1
+                        break
+                else:
+                    self._wait_counts[-1] += 1
+
+    def stats(self):
+        """
+        Metrik scheduler: kedalaman antrian, histogram ukuran batch dan waktu tunggu
+        """
+        with self._stats_lock:
+            labels = [f"<={b}ms" for b in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'requests': self._requests,
+                'batches': self._batches,
+                'avg_batch_size': self._requests / self._batches if self._batches else 0.0,
+                'batch_size_histogram': {str(k): v for k, v in sorted(self._batch_sizes.items())},
+                'wait_ms_histogram': dict(zip(labels, self._wait_counts)),
+                'avg_wait_ms': self._wait_total_ms / self._requests if self._requests else 0.0,
+                'max_wait_ms_observed': self._wait_max_ms
+            }
+
+    def shutdown(self):
+        if self._running:
+            self._running = False
+            self._queue.put(None)
+            self._worker.join(timeout=1.0)
@@ -0,0 +1,231 @@
+import contextvars
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Batas atas bucket histogram latency (detik)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Counter:
+    type_name = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram:
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key label -> [jumlah per bucket..., sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        samples = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                samples.append((f'{self.name}_bucket',
+                                _format_labels(self.labelnames, key, ('le', _format_value(bound))), cumulative))
+            samples.append((f'{self.name}_bucket', _format_labels(self.labelnames, key, ('le', '+Inf')), state[-1]))
+            samples.append((f'{self.name}_sum', _format_labels(self.labelnames, key), state[-2]))
+            samples.append((f'{self.name}_count', _format_labels(self.labelnames, key), state[-1]))
+        return samples
+
+
+class Gauge:
+    def __init__(self, name, documentation, labelnames=(), callback=None, metric_type='gauge'):
+        """
+        Metrik yang nilainya dibaca saat scrape lewat callback:
+        callback() -> angka, atau dict {tuple nilai label: angka}.
+        metric_type='counter' untuk total kumulatif milik komponen lain
+        (misalnya hits cache).
+        """
+        self.type_name = metric_type
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def samples(self):
+        value = self.callback()
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [(self.name, _format_labels(self.labelnames, key), v) for key, v in value.items()]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Registry metrik in-process dengan output format teks Prometheus.
+        Setiap proses worker punya registry sendiri.
+        """
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, callback, labelnames=(), metric_type='gauge'):
+        return self.register(Gauge(name, documentation, labelnames, callback, metric_type))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                lines.append(f'# {metric.name} tidak tersedia: {e}')
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            for name, labels, value in samples:
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'lstm_stage_duration_seconds',
+    'Durasi per tahap jalur request (get_sequence_data, scaling, forward, format, save_new_entry, ...)',
+    ['stage']
+)
+
+# Rincian tahap milik request yang sedang berjalan; ikut ke thread offload
+# lewat contextvars (lihat BoundedExecutor.submit)
+_current_trace = contextvars.ContextVar('lstm_trace', default=None)
+
+
+@contextmanager
+def stage(name):
+    """
+    Ukur satu tahap: masuk histogram STAGE_SECONDS dan rincian request aktif
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace[name] = trace.get(name, 0.0) + elapsed
+
+
+def start_trace():
+    trace = {}
+    _current_trace.set(trace)
+    return trace
+
+
+def end_trace():
+    trace = _current_trace.get()
+    _current_trace.set(None)
+    return trace or {}
+
+
+class RateLimitedLogger:
+    def __init__(self, logger, rate_per_second=10.0, burst=20):
+        """
+        Log terstruktur (satu baris JSON per event) dengan token bucket,
+        sehingga logging per request tidak menjadi biaya di jalur panas.
+        Jumlah baris yang dilewati dilaporkan di baris berikutnya.
+
+        Args:
+            logger (logging.Logger): Logger tujuan
+            rate_per_second (float): Rata-rata baris per detik, 0 = tanpa batas
+            burst (int): Jumlah baris maksimum dalam satu ledakan
+        """
+        self.logger = logger
+        self.rate = float(rate_per_second)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def log(self, event, level=logging.INFO, **fields):
+        if not self.logger.isEnabledFor(level):
+            return False
+        with self._lock:
+            if self.rate > 0:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens < 1.0:
+                    self._suppressed += 1
+                    return False
+                self._tokens -= 1.0
+            suppressed, self._suppressed = self._suppressed, 0
+        if suppressed:
+            fields['suppressed'] = suppressed
+        self.logger.log(level, json.dumps({'event': event, **fields}, default=str))
+        return True
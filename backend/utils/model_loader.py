@@ -1,18 +1,50 @@
 import torch
 import numpy as np
-import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
 from datetime import datetime, timedelta
 import traceback
 import logging
+import json
 import os
 
+from .forecaster import AdvancedLSTMForecaster, mc_dropout_view
+from .scaler import FeatureScaler
+from .metrics import stage
+from .inference_engines import EagerEngine, PARITY_ATOL, create_engine, check_parity
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def load_model_config(config_path):
+    """Load model architecture and serving options from config.json"""
+    with open(config_path) as f:
+        return json.load(f)
+
+
+class _ModelBundle:
+    """
+    Model, engine dan konstanta scaler yang harus selalu dipakai bersama.
+    Hot-swap mengganti seluruh bundle dengan satu assignment, sehingga
+    request tidak pernah mencampur bobot lama dengan scaler baru.
+    """
+    __slots__ = ('model', 'engine', 'scaler', 'scale', 'offset', 'version', 'models_dir', 'mc_model')
+
+    def __init__(self, model, engine, scaler, version, models_dir):
+        self.model = model
+        self.engine = engine
+        self.scaler = scaler
+        self.scale = scaler.scale
+        self.offset = scaler.offset
+        self.version = version
+        # Folder graph hasil export (TorchScript/ONNX) untuk bobot versi ini
+        self.models_dir = models_dir
+        # Salinan model dengan dropout aktif untuk mode uncertainty (dibuat saat dipakai)
+        self.mc_model = None
+
+
 class LSTMModelLoader:
-    def __init__(self, model_path, input_size=3, hidden_size=64, num_layers=2, output_size=8, dropout_rate=0.2):
+    def __init__(self, model_path, input_size=3, hidden_size=64, num_layers=2, output_size=8, dropout_rate=0.2,
+                 window_size=24, engine='eager', num_threads=None, artifact=None, version='base'):
         """
         Initialize LSTM model loader with predefined architecture and business parameters
         
@@ -23,77 +55,202 @@ class LSTMModelLoader:
             num_layers (int): Number of LSTM layers
             output_size (int): Number of output timesteps
             dropout_rate (float): Dropout rate for regularization
+            window_size (int): Number of timesteps in the input window
+            engine (str): Inference engine ('eager', 'quantized', 'torchscript', 'onnxruntime')
+            num_threads (int): Intra-op threads for engines with their own pool (onnxruntime)
+            artifact (dict): Preloaded artifact (see from_artifact); skips weights file and scaler fit.
+                Optional 'models_dir' points to the exported graphs of these weights
+            version (str): Model version label (see ModelRegistry), part of the cache key
         """
         # Business parameters
         self.target_harian = 476190  # Target pendapatan harian dalam rupiah
         self.harga_ternak_besar = 2000  # Harga per ternak besar
         self.harga_ternak_kecil = 1000  # Harga per ternak kecil
         
+        self.config = {
+            'input_size': input_size,
+            'hidden_size': hidden_size,
+            'num_layers': num_layers,
+            'output_size': output_size,
+            'dropout_rate': dropout_rate,
+            'window_size': window_size
+        }
+        self.input_size = input_size
+        self.window_size = window_size
+        models_dir = os.path.dirname(os.path.abspath(model_path))
+        self.num_threads = num_threads
+        
+        # Optional micro-batching scheduler (lihat enable_batching)
+        self.scheduler = None
+        # Optional prediction cache (lihat enable_cache)
+        self.cache = None
+        
         # Load model
         try:
-            from torch import nn
-            
-            class AdvancedLSTMForecaster(nn.Module):
-                def __init__(self, input_size, hidden_size, num_layers, output_size, dropout_rate=0.2):
-                    super(AdvancedLSTMForecaster, self).__init__()
-                    self.hidden_size = hidden_size
-                    self.num_layers = num_layers
-                    self.lstm = nn.LSTM(input_size=input_size,
-                                      hidden_size=hidden_size,
-                                      num_layers=num_layers,
-                                      batch_first=True,
-                                      dropout=dropout_rate)
-                    self.fc = nn.Sequential(
-                        nn.Linear(hidden_size, 128),
-                        nn.BatchNorm1d(128),
-                        nn.ReLU(),
-                        nn.Dropout(dropout_rate),
-                        nn.Linear(128, 64),
-                        nn.BatchNorm1d(64),
-                        nn.ReLU(),
-                        nn.Dropout(dropout_rate),
-                        nn.Linear(64, output_size)
-                    )
-
-                def forward(self, x):
-                    h0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
-                    c0 = torch.zeros(self.num_layers, x.size(0), self.hidden_size).to(x.device)
-                    out, _ = self.lstm(x, (h0, c0))
-                    out = self.fc(out[:, -1, :])
-                    return out
-
             self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-            self.model = AdvancedLSTMForecaster(
-                input_size=input_size,
-                hidden_size=hidden_size,
-                num_layers=num_layers,
-                output_size=output_size,
-                dropout_rate=dropout_rate
-            ).to(self.device)
-            
-            self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-            self.model.eval()
+            self.engine_name = engine
             
-            # Initialize scaler with realistic ranges
-            self.create_custom_scaler()
+            if artifact is not None:
+                state_dict = artifact['state_dict']
+                scaler = self._artifact_scaler(artifact)
+                models_dir = artifact.get('models_dir', models_dir)
+            else:
+                state_dict = torch.load(model_path, map_location=self.device)
+                # Scaler yang dikirim bersama bobot (batas default jika tidak valid)
+                scaler = FeatureScaler.load(os.path.join(models_dir, 'scaler_params.pth'))
             
-            logger.info("Model and scaler initialized successfully")
+            self._bundle = self._build_bundle(state_dict, scaler, version, models_dir)
+            logger.info(f"Model and scaler initialized successfully (version {version})")
             
         except Exception as e:
             logger.error(f"Error initializing model: {str(e)}")
             raise
 
-    def create_custom_scaler(self):
-        """Create custom MinMaxScaler with realistic value ranges"""
-        self.scaler = MinMaxScaler()
-        dummy_data = np.array([
-            [0, 0, 0],  # minimum values
-            [1000, 1000, 2000000]  # maximum realistic values
-        ])
-        self.scaler.fit(dummy_data)
-        logger.info("Custom scaler created with realistic ranges")
+    @classmethod
+    def from_artifact(cls, artifact_path, engine='eager', num_threads=None):
+        """
+        Fast boot: build the loader from a single artifact written by save_artifact
+        """
+        artifact = torch.load(artifact_path, map_location='cpu', weights_only=True, mmap=True)
+        if 'models_dir' in artifact:
+            # Disimpan relatif terhadap folder artifact (lihat save_artifact)
+            artifact['models_dir'] = os.path.normpath(
+                os.path.join(os.path.dirname(os.path.abspath(artifact_path)), artifact['models_dir']))
+        return cls(artifact_path, engine=engine, num_threads=num_threads, artifact=artifact,
+                   version=artifact.get('version', 'base'), **artifact['config'])
+
+    @classmethod
+    def from_version(cls, registry, version, engine='eager', num_threads=None):
+        """
+        Build the loader from a trained version published in a ModelRegistry
+        """
+        artifact = registry.load(version)
+        return cls(os.path.join(artifact['models_dir'], 'model_weights.pth'), engine=engine, num_threads=num_threads, artifact=artifact,
+                   version=version, **artifact['config'])
+
+    def save_artifact(self, artifact_path):
+        """
+        Serialize weights, architecture and scaler constants into one ready-to-run file
+        """
+        bundle = self._bundle
+        artifact = {
+            'config': dict(self.config),
+            'version': bundle.version,
+            'state_dict': {k: v.cpu() for k, v in bundle.model.state_dict().items()},
+            'scaler': bundle.scaler.to_constants(),
+            'models_dir': os.path.relpath(bundle.models_dir, os.path.dirname(os.path.abspath(artifact_path)))
+        }
+        tmp_path = f"{artifact_path}.tmp"
+        torch.save(artifact, tmp_path)
+        os.replace(tmp_path, artifact_path)
+        return artifact_path
+
+    @property
+    def model(self):
+        return self._bundle.model
+
+    @property
+    def engine(self):
+        return self._bundle.engine
+
+    @property
+    def scaler(self):
+        return self._bundle.scaler
+
+    @property
+    def _scale(self):
+        return self._bundle.scale
 
-    def predict_revenue(self, ternak_besar, ternak_kecil, sequence_data):
+    @property
+    def _offset(self):
+        return self._bundle.offset
+
+    @property
+    def model_version(self):
+        return self._bundle.version
+
+    @property
+    def models_dir(self):
+        return self._bundle.models_dir
+
+    @staticmethod
+    def _artifact_scaler(artifact):
+        constants = artifact['scaler']
+        return FeatureScaler.from_constants(constants['scale'], constants['offset'],
+                                            constants.get('n_samples_seen', 0), constants.get('source', 'artifact'))
+
+    def _build_bundle(self, state_dict, scaler, version, models_dir):
+        model = AdvancedLSTMForecaster(
+            input_size=self.config['input_size'],
+            hidden_size=self.config['hidden_size'],
+            num_layers=self.config['num_layers'],
+            output_size=self.config['output_size'],
+            dropout_rate=self.config['dropout_rate']
+        ).to(self.device)
+        # assign=True: parameter memakai tensor state_dict apa adanya; jika artifact
+        # di-mmap, halaman bobot dibagi semua worker lewat page cache
+        model.load_state_dict(state_dict, assign=self.device.type == 'cpu')
+        model.eval()
+        return _ModelBundle(model, self._create_engine(self.engine_name, model, models_dir), scaler, version,
+                            models_dir)
+
+    def _create_engine(self, name, model, models_dir):
+        """
+        Build the inference engine; non-eager engines must match eager outputs
+        or the loader falls back to eager
+        """
+        eager = EagerEngine(model, self.device)
+        if name == 'eager':
+            return eager
+        try:
+            engine = create_engine(name, model, self.device, models_dir, self.num_threads)
+            max_diff = check_parity(engine, eager, self.window_size, self.input_size,
+                                    atol=PARITY_ATOL.get(name, 1e-4))
+            logger.info(f"Inference engine '{name}' active (parity max diff {max_diff:.2e})")
+            return engine
+        except Exception as e:
+            logger.error(f"Engine '{name}' tidak bisa dipakai, kembali ke eager: {str(e)}")
+            return eager
+
+    def set_engine(self, name):
+        """
+        Select the inference engine for the current model
+        """
+        self.engine_name = name
+        bundle = self._bundle
+        self._bundle = _ModelBundle(bundle.model, self._create_engine(name, bundle.model, bundle.models_dir),
+                                    bundle.scaler, bundle.version, bundle.models_dir)
+
+    def swap_model(self, artifact, version):
+        """
+        Hot-swap to another model version without stopping the server.
+        
+        Bundle baru dibangun dan dicek lebih dulu, lalu dipasang dengan satu
+        assignment: request yang sedang berjalan selesai dengan bundle lama,
+        request berikutnya memakai bundle baru. Versi model ada di key cache,
+        jadi prediksi lama tidak pernah dipakai ulang.
+        
+        Args:
+            artifact (dict): {'config', 'state_dict', 'scaler': {'scale', 'offset', 'n_samples_seen'},
+                'models_dir'} (lihat ModelRegistry.load); engine non-eager dibangun
+                dari graph hasil export di models_dir
+            version (str): Version label of the new model
+        """
+        config = artifact['config']
+        for key in ('input_size', 'window_size', 'output_size'):
+            if config[key] != self.config[key]:
+                raise ValueError(f"Versi {version} tidak kompatibel: {key}={config[key]}, "
+                                 f"server memakai {self.config[key]}")
+        self.config.update(config)
+        bundle = self._build_bundle(artifact['state_dict'], self._artifact_scaler(artifact), version,
+                                    artifact.get('models_dir', self.models_dir))
+        self._bundle = bundle
+        if self.cache is not None:
+            self.cache.clear()
+        logger.info(f"Model hot-swapped to version {version}")
+
+    def predict_revenue(self, ternak_besar, ternak_kecil, sequence_data, history_version=None, horizon=None,
+                        mc_samples=0, percentiles=(5, 50, 95)):
         """
         Predict revenue based on input parameters
         
@@ -101,42 +258,66 @@ class LSTMModelLoader:
             ternak_besar (float): Number of large livestock
             ternak_kecil (float): Number of small livestock
             sequence_data (np.array): Historical sequence data
+            history_version (int): DataProcessor.version used to build sequence_data;
+                enables the prediction cache when given
+            horizon (int): Number of market days to forecast; beyond output_size
+                the forecast is rolled forward autoregressively (see _rollout)
+            mc_samples (int): Monte Carlo dropout samples for uncertainty bands, 0 = off
+            percentiles (tuple): Percentiles reported per forecast day when mc_samples > 0
             
         Returns:
-            dict: Prediction results including daily predictions and statistics
+            dict: Prediction results including daily predictions and statistics;
+                base_avg_prediction is the mean of the model's first output_size
+                steps regardless of horizon (the value /predict persists)
         """
         try:
-            logger.info(f"Starting prediction for: ternak_besar={ternak_besar}, ternak_kecil={ternak_kecil}")
-            
             # Calculate current revenue
             current_revenue = float((ternak_besar * self.harga_ternak_besar) + 
                                   (ternak_kecil * self.harga_ternak_kecil))
-            logger.info(f"Current revenue calculated: {current_revenue}")
-            
-            # Prepare sequence data
-            normalized_sequence = np.zeros_like(sequence_data)
-            for i in range(sequence_data.shape[0]):
-                if i == sequence_data.shape[0] - 1:
-                    sequence_data[i] = [ternak_besar, ternak_kecil, current_revenue]
-                normalized_sequence[i] = self.scaler.transform(sequence_data[i].reshape(1, -1))
-            
-            # Generate predictions
-            model_input = torch.FloatTensor(normalized_sequence).reshape(1, 24, 3).to(self.device)
-            with torch.no_grad():
-                raw_predictions = self.model(model_input).cpu().numpy()
-            
-            # Process predictions
-            predictions = []
-            for pred in raw_predictions[0]:
-                if current_revenue > self.target_harian:
-                    pred_value = current_revenue * (0.9 + pred * 0.2)
-                else:
-                    pred_value = current_revenue + (self.target_harian - current_revenue) * pred
-                predictions.append(pred_value)
+            
+            bundle = self._bundle
+            
+            # Cache hanya menyimpan prediksi mentah; tanggal selalu dihitung ulang
+            cache_key = None
+            if self.cache is not None and history_version is not None:
+                cache_key = self.cache.make_key(history_version, ternak_besar, ternak_kecil, bundle.version)
+                predictions = self.cache.get(cache_key)
+            else:
+                predictions = None
+            
+            if predictions is None:
+                # Prepare sequence data
+                sequence_data[-1] = [ternak_besar, ternak_kecil, current_revenue]
+                
+                # Generate predictions (lewat scheduler jika micro-batching aktif);
+                # 'inference' termasuk waktu tunggu antrian scheduler
+                with stage('inference'):
+                    if self.scheduler is not None:
+                        raw_prediction = self.scheduler.submit(sequence_data)
+                    else:
+                        raw_prediction = self._forward_raw(sequence_data[np.newaxis])[0]
+                
+                # Process predictions
+                predictions = self._postprocess(raw_prediction, current_revenue)
+                if cache_key is not None:
+                    predictions.setflags(write=False)
+                    self.cache.put(cache_key, predictions)
+            
+            base_average = float(np.mean(predictions))
+            if horizon is not None:
+                with stage('rollout'):
+                    predictions = self._rollout(bundle, ternak_besar, ternak_kecil, current_revenue, sequence_data,
+                                                predictions, horizon, history_version=history_version)
             
             # Format results
-            result = self._format_predictions(predictions, current_revenue)
-            logger.info("Predictions generated and formatted successfully")
+            with stage('format_predictions'):
+                result = self._format_predictions(predictions, current_revenue)
+            result['base_avg_prediction'] = base_average
+            if mc_samples:
+                with stage('mc_dropout'):
+                    samples = self._mc_dropout_samples(bundle, ternak_besar, ternak_kecil, current_revenue,
+                                                       sequence_data, mc_samples, len(predictions))
+                    self._attach_bands(result, samples, percentiles)
             
             return result
             
@@ -145,6 +326,238 @@ class LSTMModelLoader:
             traceback.print_exc()
             raise Exception(f"Gagal melakukan prediksi: {str(e)}")
 
+    def predict_revenue_batch(self, scenarios, sequence_data, history_version=None, chunk_size=256):
+        """
+        Predict many (ternak_besar, ternak_kecil) scenarios against the same history window
+        
+        Args:
+            scenarios (list): List of (ternak_besar, ternak_kecil) pairs
+            sequence_data (np.array): Historical sequence data shared by all scenarios
+            history_version (int): DataProcessor.version, enables the prediction cache
+            chunk_size (int): Maximum rows per forward pass
+            
+        Yields:
+            dict: Prediction result per scenario, in input order
+        """
+        bundle = self._bundle
+        base_sequence = np.asarray(sequence_data, dtype=np.float64)
+        for start in range(0, len(scenarios), chunk_size):
+            chunk = np.asarray(scenarios[start:start + chunk_size], dtype=np.float64).reshape(-1, 2)
+            current_revenue = chunk[:, 0] * self.harga_ternak_besar + chunk[:, 1] * self.harga_ternak_kecil
+            
+            predictions = [None] * len(chunk)
+            keys = [None] * len(chunk)
+            if self.cache is not None and history_version is not None:
+                for i, (ternak_besar, ternak_kecil) in enumerate(chunk):
+                    keys[i] = self.cache.make_key(history_version, ternak_besar, ternak_kecil, bundle.version)
+                    predictions[i] = self.cache.get(keys[i])
+            missing = [i for i, pred in enumerate(predictions) if pred is None]
+            
+            if missing:
+                # Satu tensor (B, window, features): window sama, baris terakhir per skenario
+                sequences = np.repeat(base_sequence[np.newaxis], len(missing), axis=0)
+                sequences[:, -1, :2] = chunk[missing]
+                sequences[:, -1, 2] = current_revenue[missing]
+                with stage('scaling'):
+                    sequences = sequences * bundle.scale + bundle.offset
+                with stage('forward'):
+                    raw_predictions = bundle.engine(sequences)
+                values = self._postprocess(raw_predictions, current_revenue[missing, np.newaxis])
+                for i, row in zip(missing, values):
+                    row = row.copy()
+                    row.setflags(write=False)
+                    predictions[i] = row
+                    if keys[i] is not None:
+                        self.cache.put(keys[i], row)
+            
+            for pred, revenue in zip(predictions, current_revenue):
+                with stage('format_predictions'):
+                    result = self._format_predictions(pred, float(revenue))
+                yield result
+
+    def _rollout(self, bundle, ternak_besar, ternak_kecil, current_revenue, sequence_data, base_predictions,
+                 horizon, history_version=None):
+        """
+        Extend the forecast to `horizon` market days autoregressively.
+        
+        Setiap blok output_size prediksi diumpankan kembali sebagai baris baru
+        (ternak_besar, ternak_kecil, prediksi pendapatan). State LSTM (h, c)
+        dibawa antar blok sehingga hanya baris baru yang di-encode; konteks
+        model tumbuh dari window awal, bukan window geser 24 langkah.
+        Rollout disimpan di cache bersama state-nya, jadi horizon yang lebih
+        panjang untuk skenario yang sama hanya menghitung blok tambahannya.
+        
+        Selalu memakai modul eager (engine lain tidak mengekspos state LSTM);
+        blok pertama tetap hasil engine yang aktif.
+        """
+        if horizon <= len(base_predictions):
+            return base_predictions[:horizon]
+        
+        cache_key = None
+        state = None
+        if self.cache is not None and history_version is not None:
+            cache_key = ('rollout',) + self.cache.make_key(history_version, ternak_besar, ternak_kecil,
+                                                           bundle.version)
+            state = self.cache.get(cache_key)
+        
+        with torch.no_grad():
+            if state is None:
+                normalized_sequence = self._prepare_input(bundle, ternak_besar, ternak_kecil, current_revenue,
+                                                          sequence_data)
+                _, hidden = bundle.model.encode(self._to_tensor(normalized_sequence[np.newaxis]))
+                state = (base_predictions, hidden)
+            
+            predictions, hidden = state
+            if len(predictions) >= horizon:
+                return predictions[:horizon]
+            
+            blocks = [predictions]
+            feedback = predictions[-self.config['output_size']:]
+            steps = len(predictions)
+            while steps < horizon:
+                rows = np.empty((len(feedback), self.input_size))
+                rows[:, 0] = ternak_besar
+                rows[:, 1] = ternak_kecil
+                rows[:, 2] = feedback
+                out, hidden = bundle.model.encode(self._to_tensor((rows * bundle.scale + bundle.offset)[np.newaxis]),
+                                                  hidden)
+                feedback = self._postprocess(bundle.model.fc(out).cpu().numpy()[0], current_revenue)
+                blocks.append(feedback)
+                steps += len(feedback)
+        
+        predictions = np.concatenate(blocks)
+        predictions.setflags(write=False)
+        if cache_key is not None:
+            self.cache.put(cache_key, (predictions, hidden))
+        return predictions[:horizon]
+
+    def _mc_dropout_samples(self, bundle, ternak_besar, ternak_kecil, current_revenue, sequence_data, n_samples,
+                            horizon):
+        """
+        Sample the forecast n_samples times with dropout active (MC dropout).
+        
+        Input diulang n_samples kali dalam satu tensor batch, sehingga setiap
+        blok hanya butuh satu forward pass; setiap baris batch mendapat mask
+        dropout sendiri. Untuk horizon > output_size setiap sampel di-rollout
+        dengan prediksinya sendiri dan state (h, c) miliknya.
+        
+        Returns:
+            np.array: Revenue samples of shape (n_samples, horizon)
+        """
+        if bundle.mc_model is None:
+            bundle.mc_model = mc_dropout_view(bundle.model)
+        model = bundle.mc_model
+        
+        normalized_sequence = self._prepare_input(bundle, ternak_besar, ternak_kecil, current_revenue, sequence_data)
+        model_input = self._to_tensor(normalized_sequence[np.newaxis]).expand(n_samples, -1, -1)
+        with torch.no_grad():
+            out, hidden = model.encode(model_input)
+            feedback = self._postprocess(model.fc(out).cpu().numpy(), current_revenue)
+            blocks = [feedback]
+            steps = feedback.shape[1]
+            while steps < horizon:
+                rows = np.empty(feedback.shape + (self.input_size,))
+                rows[..., 0] = ternak_besar
+                rows[..., 1] = ternak_kecil
+                rows[..., 2] = feedback
+                out, hidden = model.encode(self._to_tensor(rows * bundle.scale + bundle.offset), hidden)
+                feedback = self._postprocess(model.fc(out).cpu().numpy(), current_revenue)
+                blocks.append(feedback)
+                steps += feedback.shape[1]
+        return np.concatenate(blocks, axis=1)[:, :horizon]
+
+    def _attach_bands(self, result, samples, percentiles):
+        """Add per-day percentile bands of revenue and deficit to a formatted result"""
+        percentiles = [float(q) for q in percentiles]
+        bands = np.percentile(samples, percentiles, axis=0)
+        deficit_bands = np.percentile(self.target_harian - samples, percentiles, axis=0)
+        prob_tercapai = np.mean(samples >= self.target_harian, axis=0)
+        for i, item in enumerate(result['predictions']):
+            item['interval'] = {f"p{q:g}": float(bands[j, i]) for j, q in enumerate(percentiles)}
+            item['defisit_interval'] = {f"p{q:g}": float(deficit_bands[j, i]) for j, q in enumerate(percentiles)}
+            item['prob_tercapai'] = float(prob_tercapai[i])
+        result['uncertainty'] = {
+            'method': 'mc_dropout',
+            'samples': int(samples.shape[0]),
+            'percentiles': percentiles
+        }
+
+    def _to_tensor(self, batch):
+        return torch.as_tensor(np.asarray(batch, dtype=np.float32)).to(self.device)
+
+    def _prepare_input(self, bundle, ternak_besar, ternak_kecil, current_revenue, sequence_data):
+        """Replace the last timestep with current input and normalize the window"""
+        sequence_data[-1] = [ternak_besar, ternak_kecil, current_revenue]
+        # Min-max scaling sebagai satu operasi affine: X * scale_ + min_
+        with stage('scaling'):
+            return bundle.scaler.transform(sequence_data)
+
+    def _forward_raw(self, batch):
+        """
+        Normalize raw windows and run them through the engine, using one
+        bundle snapshot so scaler and weights always belong together
+        """
+        bundle = self._bundle
+        with stage('scaling'):
+            batch = bundle.scaler.transform(batch)
+        with stage('forward'):
+            return bundle.engine(batch)
+
+    def forward_batch(self, batch):
+        """
+        Run a single forward pass over a batch of normalized windows
+        
+        Args:
+            batch (np.array): Array of shape (B, window_size, input_size)
+            
+        Returns:
+            np.array: Raw model outputs of shape (B, output_size)
+        """
+        return self.engine(batch)
+
+    def _postprocess(self, raw_prediction, current_revenue):
+        """Convert raw model outputs to revenue values"""
+        raw_prediction = np.asarray(raw_prediction, dtype=np.float64)
+        return np.where(
+            current_revenue > self.target_harian,
+            current_revenue * (0.9 + raw_prediction * 0.2),
+            current_revenue + (self.target_harian - current_revenue) * raw_prediction
+        )
+
+    def _inverse_postprocess(self, revenue, current_revenue):
+        """Inverse of _postprocess: revenue values to raw model targets (training)"""
+        revenue = np.asarray(revenue, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            raw = np.where(
+                current_revenue > self.target_harian,
+                (revenue / current_revenue - 0.9) / 0.2,
+                (revenue - current_revenue) / (self.target_harian - current_revenue)
+            )
+        return np.nan_to_num(raw, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def enable_batching(self, max_batch_size=32, max_wait_ms=3.0):
+        """
+        Route predictions through a micro-batching scheduler so that concurrent
+        requests share one forward pass
+        """
+        from .inference_scheduler import InferenceScheduler
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+        self.scheduler = InferenceScheduler(
+            self._forward_raw,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+        logger.info(f"Micro-batching enabled: max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms}")
+
+    def enable_cache(self, max_entries=1024, ttl_seconds=300.0):
+        """
+        Cache raw predictions keyed by (history version, ternak_besar, ternak_kecil)
+        """
+        from .prediction_cache import PredictionCache
+        self.cache = PredictionCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        logger.info(f"Prediction cache enabled: max_entries={max_entries}, ttl_seconds={ttl_seconds}")
+
     def _format_predictions(self, predictions, current_revenue):
         """Format predictions with business logic and dates"""
         result = {
@@ -154,18 +567,18 @@ class LSTMModelLoader:
             'current_revenue': current_revenue
         }
         
-        # Get next 8 Tuesday/Thursday dates
+        # Get the next Tuesday/Thursday dates, one per prediction
         current_date = datetime.now()
         dates = []
         days = []
         
-        for i in range(28):
+        i = 0
+        while len(dates) < len(predictions):
             next_date = current_date + timedelta(days=i)
             if next_date.weekday() in [1, 3]:
                 dates.append(next_date.strftime('%Y-%m-%d'))
                 days.append('Selasa' if next_date.weekday() == 1 else 'Kamis')
-                if len(dates) == 8:
-                    break
+            i += 1
         
         # Format each prediction
         for pred, date, day in zip(predictions, dates, days):
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import torch
+
+from .scaler import FeatureScaler
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_FILENAME = 'model_weights.pth'
+CONFIG_FILENAME = 'config.json'
+SCALER_FILENAME = 'scaler_params.pth'
+METRICS_FILENAME = 'metrics.json'
+CURRENT_POINTER = 'CURRENT'
+
+
+class ModelRegistry:
+    def __init__(self, models_dir):
+        """
+        Penyimpanan versi model hasil training di Models/versions/<versi>/.
+        Setiap versi berisi model_weights.pth, config.json, scaler_params.pth
+        dan metrics.json, serta graph TorchScript/ONNX hasil export jika ada;
+        file CURRENT menunjuk versi yang dilayani server.
+
+        Args:
+            models_dir (str): Folder Models
+        """
+        self.models_dir = models_dir
+        self.versions_dir = os.path.join(models_dir, 'versions')
+        self.pointer_path = os.path.join(self.versions_dir, CURRENT_POINTER)
+
+    def version_dir(self, version):
+        return os.path.join(self.versions_dir, version)
+
+    def current(self):
+        """
+        Versi yang aktif, atau None jika belum pernah ada hasil training
+        """
+        try:
+            with open(self.pointer_path) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def publish(self, state_dict, config, scaler, metrics=None, activate=True, export=None):
+        """
+        Tulis versi baru secara atomik lalu (opsional) jadikan versi aktif.
+
+        Folder versi ditulis di folder sementara lalu di-rename, dan pointer
+        CURRENT diganti dengan os.replace, sehingga server yang sedang berjalan
+        tidak pernah melihat versi yang setengah tertulis.
+
+        Args:
+            export (callable): export(folder) menulis graph TorchScript/ONNX untuk
+                bobot ini ke folder versi (dipakai engine non-eager setelah swap)
+
+        Returns:
+            str: Nama versi
+        """
+        os.makedirs(self.versions_dir, exist_ok=True)
+        version = datetime.now().strftime('%Y%m%d-%H%M%S')
+        suffix = 1
+        while os.path.exists(self.version_dir(version)):
+            suffix += 1
+            version = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{suffix}"
+
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.versions_dir)
+        try:
+            torch.save({k: v.cpu() for k, v in state_dict.items()}, os.path.join(tmp_dir, WEIGHTS_FILENAME))
+            scaler.save(os.path.join(tmp_dir, SCALER_FILENAME))
+            with open(os.path.join(tmp_dir, CONFIG_FILENAME), 'w') as f:
+                json.dump(config, f, indent=2)
+            with open(os.path.join(tmp_dir, METRICS_FILENAME), 'w') as f:
+                json.dump(metrics or {}, f, indent=2)
+            if export is not None:
+                export(tmp_dir)
+            os.replace(tmp_dir, self.version_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """
+        Jadikan `version` versi aktif (juga dipakai untuk rollback)
+        """
+        if not os.path.isfile(os.path.join(self.version_dir(version), WEIGHTS_FILENAME)):
+            raise ValueError(f"Versi model tidak ditemukan: {version}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.versions_dir)
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, self.pointer_path)
+        logger.info(f"Model version {version} activated")
+
+    def load(self, version):
+        """
+        Muat satu versi dalam bentuk artifact (lihat LSTMModelLoader.from_artifact)
+        """
+        directory = self.version_dir(version)
+        with open(os.path.join(directory, CONFIG_FILENAME)) as f:
+            config = json.load(f)
+        state_dict = torch.load(os.path.join(directory, WEIGHTS_FILENAME), map_location='cpu', weights_only=True)
+        scaler = FeatureScaler.load(os.path.join(directory, SCALER_FILENAME))
+        architecture = {
+            key: config[key]
+            for key in ('input_size', 'hidden_size', 'num_layers', 'output_size', 'dropout_rate', 'window_size')
+        }
+        return {
+            'config': architecture,
+            'state_dict': state_dict,
+            'scaler': scaler.to_constants(),
+            'models_dir': directory
+        }
@@ -0,0 +1,73 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .forking import register_after_fork
+
+
+class OverloadedError(Exception):
+    """Pool offload penuh; request sebaiknya dijawab 503"""
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers=4, max_pending=64, acquire_timeout=5.0):
+        """
+        Thread pool terbatas untuk pekerjaan berat (inference model, pandas).
+        Thread cukup karena PyTorch/NumPy melepas GIL selama komputasi, dan
+        model tidak perlu dimuat ulang per proses.
+
+        Args:
+            max_workers (int): Jumlah pekerjaan yang berjalan bersamaan
+            max_pending (int): Jumlah pekerjaan yang boleh mengantri
+            acquire_timeout (float): Batas tunggu slot sebelum OverloadedError
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self.acquire_timeout = acquire_timeout
+        self._create_pool()
+        register_after_fork(self._create_pool)
+
+    def _create_pool(self):
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='offload')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise OverloadedError("Server sedang sibuk, coba lagi")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            # Salin contextvars (rincian tahap request, lihat utils/metrics.py) ke thread pool
+            future = self._executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Jalankan fn di pool dan tunggu hasilnya
+        """
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'in_flight': self.in_flight,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
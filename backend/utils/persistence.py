@@ -0,0 +1,167 @@
+import queue
+import threading
+import time
+import logging
+from .forking import register_after_fork
+from .offload import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+# Jeda maksimum antar percobaan ulang commit yang gagal (detik)
+MAX_RETRY_DELAY = 30.0
+
+
+class StorageUnavailableError(OverloadedError):
+    """Storage tidak bisa ditulis dalam batas waktu; request sebaiknya dijawab 503"""
+
+
+class PersistenceWriter:
+    def __init__(self, storage, max_queue_size=10000, max_batch=256):
+        """
+        Satu-satunya penulis ke storage: entri diambil dari antrian terbatas
+        (FIFO) lalu di-commit berkelompok (group commit) dalam satu transaksi.
+
+        Args:
+            storage: Storage backend dengan method append(rows)
+            max_queue_size (int): Kapasitas antrian; submit menunggu jika penuh
+            max_batch (int): Jumlah entri maksimum per commit
+        """
+        self.storage = storage
+        self.max_batch = max(1, int(max_batch))
+        self.max_queue_size = max_queue_size
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._listeners = []
+        self._changed = threading.Condition()
+        self.submitted = 0
+        self.committed = 0
+        self.commits = 0
+        self.retries = 0
+        self._running = True
+        self._start_worker()
+        register_after_fork(self._after_fork)
+
+    def _start_worker(self):
+        self._worker = threading.Thread(target=self._run, name='persistence-writer', daemon=True)
+        self._worker.start()
+
+    def _after_fork(self):
+        # Setiap worker hasil fork punya antrian dan thread penulis sendiri
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._changed = threading.Condition()
+        self.submitted = self.committed = self.commits = self.retries = 0
+        if self._running:
+            self._start_worker()
+
+    def add_listener(self, callback):
+        """
+        Daftarkan callback(rows, result) yang dipanggil setelah setiap commit,
+        sebelum flush() menganggap commit tersebut selesai. `result` adalah
+        nilai kembali storage.append (misalnya rentang id untuk SQLiteStorage).
+        Callback berjalan di thread writer dan tidak boleh menunggu flush().
+        """
+        self._listeners.append(callback)
+
+    def submit(self, rows, timeout=None):
+        """
+        Antrikan entri untuk ditulis; kembali tanpa menunggu disk I/O.
+        Raise StorageUnavailableError jika antrian masih penuh setelah `timeout`
+        detik (storage macet dan commit sedang diulang).
+        """
+        if not self._running:
+            raise RuntimeError("Persistence writer sudah dihentikan")
+        rows = list(rows)
+        # Dihitung sebelum masuk antrian agar flush()/idle() tidak pernah
+        # menganggap selesai selama entri ini masih di antrian
+        with self._changed:
+            self.submitted += len(rows)
+        try:
+            self._queue.put(rows, timeout=timeout)
+        except queue.Full:
+            with self._changed:
+                self.submitted -= len(rows)
+                self._changed.notify_all()
+            raise StorageUnavailableError("Antrian penulisan penuh, storage belum bisa ditulis")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = list(item)
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.extend(item)
+            self._commit(batch)
+            if stop:
+                break
+
+    def _commit(self, batch):
+        # Entri sudah tampil di memori (index, rollup), jadi tidak boleh dibuang:
+        # ulangi dengan backoff sampai storage pulih. Selama itu antrian tidak
+        # mengalir dan submit() tertahan saat antrian penuh (backpressure).
+        delay = 0.5
+        while True:
+            try:
+                result = self.storage.append(batch)
+                break
+            except Exception as e:
+                with self._changed:
+                    self.retries += 1
+                logger.error(f"Group commit gagal ({len(batch)} entri), mencoba ulang dalam {delay:.1f} detik: {str(e)}")
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+        for callback in self._listeners:
+            try:
+                callback(batch, result)
+            except Exception as e:
+                logger.error(f"Listener persistence error: {str(e)}")
+        with self._changed:
+            self.committed += len(batch)
+            self.commits += 1
+            self._changed.notify_all()
+
+    def idle(self):
+        """
+        True jika tidak ada entri yang menunggu ditulis
+        """
+        with self._changed:
+            return self.committed >= self.submitted
+
+    def flush(self, timeout=None):
+        """
+        Tunggu sampai semua entri yang sudah disubmit selesai ditulis
+
+        Returns:
+            bool: False jika `timeout` habis lebih dulu
+        """
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self.committed >= self.submitted, timeout
+            )
+
+    def close(self, timeout=10.0):
+        if self._running:
+            self._running = False
+            if not self.flush(timeout):
+                logger.error(f"{self.submitted - self.committed} entri belum tertulis saat writer dihentikan")
+            self._queue.put(None)
+            self._worker.join(timeout)
+
+    def stats(self):
+        with self._changed:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'submitted': self.submitted,
+                'committed': self.committed,
+                'commits': self.commits,
+                'retries': self.retries,
+                'avg_group_size': self.committed / self.commits if self.commits else 0.0
+            }
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    def __init__(self, max_entries=1024, ttl_seconds=300.0):
+        """
+        Cache LRU + TTL untuk hasil prediksi mentah.
+        Key berisi versi model dan versi riwayat data sehingga setiap
+        penulisan data maupun hot-swap model otomatis membuat entri lama
+        tidak terpakai lagi.
+
+        Args:
+            max_entries (int): Jumlah maksimum entri (batas memori)
+            ttl_seconds (float): Umur maksimum entri, 0 = tanpa TTL
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(history_version, ternak_besar, ternak_kecil, model_version='base'):
+        return (model_version, int(history_version), float(ternak_besar), float(ternak_kecil))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,169 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ('daily', 'weekly', 'monthly', 'market_day')
+
+# Hari pasar hewan Selagalas (weekday: Senin = 0)
+MARKET_DAYS = {1: 'Selasa', 3: 'Kamis'}
+
+_EPOCH = date(1970, 1, 1)
+
+# Isi bucket: [jumlah entri, jumlah hari berisi data, total pendapatan, ternak besar, ternak kecil]
+_COUNT, _DAYS, _TOTAL, _BESAR, _KECIL = range(5)
+
+
+def _weekday(days):
+    # 1970-01-01 adalah hari Kamis
+    return (days + 3) % 7
+
+
+def _bucket_key(granularity, days):
+    """
+    Key bucket (bilangan bulat, urutan sama dengan urutan waktu) untuk
+    tanggal dalam hari sejak epoch; bekerja untuk skalar maupun array
+    """
+    if granularity == 'weekly':
+        return days - _weekday(days)
+    if granularity == 'monthly':
+        return np.asarray(days, dtype='datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return days
+
+
+class RevenueRollups:
+    def __init__(self):
+        """
+        Agregat pendapatan per hari, minggu (Senin-Minggu), bulan dan hari
+        pasar (Selasa/Kamis) yang diperbarui inkremental setiap entri baru,
+        sehingga ringkasan dilayani dalam O(jumlah bucket) tanpa memindai
+        seluruh riwayat. Bucket market_day hanya berisi entri bertanggal
+        Selasa atau Kamis.
+
+        Defisit dihitung saat query terhadap target_harian x jumlah hari berisi data.
+        """
+        self._keys = {granularity: [] for granularity in GRANULARITIES}
+        self._buckets = {granularity: {} for granularity in GRANULARITIES}
+
+    def rebuild(self, dates, values):
+        """
+        Hitung ulang semua bucket dari riwayat terurut (vektorisasi, satu kali per load)
+
+        Args:
+            dates (np.array): Tanggal datetime64[D] terurut naik
+            values (np.array): (N, 3) Ternak Besar, Ternak Kecil, Total Pendapatan
+        """
+        days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        for granularity in GRANULARITIES:
+            self._keys[granularity] = []
+            self._buckets[granularity] = {}
+            if granularity == 'market_day':
+                mask = np.isin(_weekday(days), list(MARKET_DAYS))
+                g_days, g_values = days[mask], values[mask]
+            else:
+                g_days, g_values = days, values
+            if len(g_days) == 0:
+                continue
+
+            keys = _bucket_key(granularity, g_days)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            counts = np.diff(np.r_[starts, len(keys)])
+            new_day = np.r_[True, g_days[1:] != g_days[:-1]].astype(np.int64)
+            distinct_days = np.add.reduceat(new_day, starts)
+            sums = np.add.reduceat(g_values, starts, axis=0)
+
+            bucket_keys = keys[starts].tolist()
+            self._keys[granularity] = bucket_keys
+            self._buckets[granularity] = {
+                key: [int(count), int(n_days), float(row[2]), float(row[0]), float(row[1])]
+                for key, count, n_days, row in zip(bucket_keys, counts, distinct_days, sums)
+            }
+
+    def add(self, entry_date, row):
+        """
+        Tambahkan satu entri ke semua bucket terkait: O(1) untuk tanggal
+        terbaru, O(log bucket) + geser list untuk tanggal lampau
+
+        Args:
+            entry_date: Tanggal entri (str, date atau datetime64)
+            row (list): Ternak Besar, Ternak Kecil, Total Pendapatan
+        """
+        day = int(np.datetime64(pd.Timestamp(entry_date).date(), 'D').astype(np.int64))
+        new_day = day not in self._buckets['daily']
+        for granularity in GRANULARITIES:
+            if granularity == 'market_day' and _weekday(day) not in MARKET_DAYS:
+                continue
+            key = int(_bucket_key(granularity, day))
+            bucket = self._buckets[granularity].get(key)
+            if bucket is None:
+                bucket = self._buckets[granularity][key] = [0, 0, 0.0, 0.0, 0.0]
+                keys = self._keys[granularity]
+                if not keys or key > keys[-1]:
+                    keys.append(key)
+                else:
+                    insort(keys, key)
+            bucket[_COUNT] += 1
+            bucket[_DAYS] += int(new_day)
+            bucket[_TOTAL] += float(row[2])
+            bucket[_BESAR] += float(row[0])
+            bucket[_KECIL] += float(row[1])
+
+    def summary(self, granularity, target_harian, start=None, end=None):
+        """
+        Ringkasan per bucket dalam rentang tanggal (bucket yang memuat start s/d end)
+
+        Args:
+            granularity (str): daily, weekly, monthly atau market_day
+            target_harian (float): Target pendapatan per hari pasar
+            start, end (str): Batas tanggal inklusif YYYY-MM-DD (opsional)
+
+        Returns:
+            list: Record JSON-ready, terurut waktu
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Granularity harus salah satu dari: {', '.join(GRANULARITIES)}")
+        keys = self._keys[granularity]
+        lo = 0 if start is None else bisect_left(keys, self._date_key(granularity, start))
+        hi = len(keys) if end is None else bisect_right(keys, self._date_key(granularity, end))
+        buckets = self._buckets[granularity]
+        return [self._format(granularity, key, buckets[key], target_harian) for key in keys[lo:hi]]
+
+    @staticmethod
+    def _date_key(granularity, value):
+        day = int(np.datetime64(value, 'D').astype(np.int64))
+        return int(_bucket_key(granularity, day))
+
+    @staticmethod
+    def _format(granularity, key, bucket, target_harian):
+        if granularity == 'monthly':
+            start = date(1970 + key // 12, key % 12 + 1, 1)
+            label = start.strftime('%Y-%m')
+        else:
+            start = _EPOCH + timedelta(days=key)
+            if granularity == 'weekly':
+                year, week, _ = start.isocalendar()
+                label = f"{year}-W{week:02d}"
+            else:
+                label = start.isoformat()
+
+        target = target_harian * bucket[_DAYS]
+        deficit = target - bucket[_TOTAL]
+        record = {
+            'periode': label,
+            'mulai': start.isoformat(),
+            'jumlah_entri': bucket[_COUNT],
+            'jumlah_hari': bucket[_DAYS],
+            'total_pendapatan': bucket[_TOTAL],
+            'rata_rata': bucket[_TOTAL] / bucket[_COUNT],
+            'rata_rata_harian': bucket[_TOTAL] / bucket[_DAYS],
+            'ternak_besar': bucket[_BESAR],
+            'ternak_kecil': bucket[_KECIL],
+            'target': target,
+            'defisit': deficit,
+            'status': 'KURANG' if deficit > 0 else 'TERCAPAI'
+        }
+        if granularity == 'market_day':
+            record['hari'] = MARKET_DAYS[start.weekday()]
+        return record
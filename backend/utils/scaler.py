@@ -0,0 +1,154 @@
+import logging
+import os
+import pickle
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Batas default bila scaler_params.pth tidak ada atau tidak masuk akal:
+# 0-1000 ekor per jenis ternak, pendapatan 0-2.000.000 rupiah
+DEFAULT_DATA_MIN = (0.0, 0.0, 0.0)
+DEFAULT_DATA_MAX = (1000.0, 1000.0, 2000000.0)
+
+# Global numpy yang dibutuhkan untuk membaca scaler_params.pth format lama (ndarray)
+_multiarray = getattr(np, '_core', None) or np.core
+_NUMPY_GLOBALS = [
+    (_multiarray.multiarray._reconstruct, 'numpy.core.multiarray._reconstruct'),
+    np.ndarray,
+    np.dtype,
+    np.dtypes.Float64DType
+]
+
+
+class FeatureScaler:
+    def __init__(self, data_min=DEFAULT_DATA_MIN, data_max=DEFAULT_DATA_MAX, n_samples_seen=0, source='default'):
+        """
+        Min-max scaler (feature_range 0..1) yang diterapkan sebagai konstanta
+        affine NumPy: X_scaled = X * scale + offset. Tanpa sklearn.
+
+        Args:
+            data_min (array): Batas bawah per fitur
+            data_max (array): Batas atas per fitur
+            n_samples_seen (int): Jumlah baris riwayat saat terakhir di-fit
+                (informasi; refit_scaler selalu memindai seluruh riwayat)
+            source (str): Asal parameter (untuk log dan stats)
+        """
+        self.source = source
+        self.n_samples_seen = int(n_samples_seen)
+        self._set_bounds(data_min, data_max)
+
+    def _set_bounds(self, data_min, data_max):
+        self.data_min = np.array(data_min, dtype=np.float64)
+        self.data_max = np.array(data_max, dtype=np.float64)
+        data_range = self.data_max - self.data_min
+        # Sama seperti sklearn: fitur konstan tidak diskalakan
+        data_range[data_range == 0] = 1.0
+        self.scale = 1.0 / data_range
+        self.offset = -self.data_min * self.scale
+
+    @classmethod
+    def from_constants(cls, scale, offset, n_samples_seen=0, source='artifact'):
+        """Bangun scaler dari konstanta affine (misalnya dari artifact fast boot)"""
+        scale = np.asarray(scale, dtype=np.float64)
+        data_min = -np.asarray(offset, dtype=np.float64) / scale
+        return cls(data_min, data_min + 1.0 / scale, n_samples_seen, source=source)
+
+    def to_constants(self):
+        """Konstanta affine untuk artifact (lihat LSTMModelLoader.save_artifact)"""
+        return {
+            'scale': [float(v) for v in self.scale],
+            'offset': [float(v) for v in self.offset],
+            'n_samples_seen': self.n_samples_seen,
+            'source': self.source
+        }
+
+    def transform(self, values):
+        return values * self.scale + self.offset
+
+    def copy(self):
+        return FeatureScaler(self.data_min, self.data_max, self.n_samples_seen, self.source)
+
+    def partial_fit(self, values, count=True):
+        """
+        Refit inkremental: perlebar batas min/max dengan baris baru (running min/max)
+
+        Args:
+            values (np.array): Baris baru (N, fitur)
+            count (bool): Tambahkan N ke n_samples_seen (False untuk baris turunan,
+                misalnya pendapatan saat ini yang bukan baris riwayat)
+
+        Returns:
+            bool: True jika batas berubah
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.data_min))
+        if count:
+            self.n_samples_seen += len(values)
+        values = values[np.isfinite(values).all(axis=1)]
+        if len(values) == 0:
+            return False
+        data_min = np.minimum(self.data_min, values.min(axis=0))
+        data_max = np.maximum(self.data_max, values.max(axis=0))
+        if np.array_equal(data_min, self.data_min) and np.array_equal(data_max, self.data_max):
+            return False
+        self._set_bounds(data_min, data_max)
+        self.source = 'refit'
+        return True
+
+    def save(self, path):
+        """
+        Simpan ke scaler_params.pth (tensor, bisa dibaca dengan weights_only=True)
+        """
+        torch.save({
+            'data_min': torch.from_numpy(self.data_min.copy()),
+            'data_max': torch.from_numpy(self.data_max.copy()),
+            'n_samples_seen': self.n_samples_seen
+        }, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Muat scaler_params.pth ({'data_min', 'data_max'} sebagai tensor atau
+        ndarray). Parameter yang tidak masuk akal diganti batas default.
+        """
+        if not os.path.exists(path):
+            logger.warning(f"Scaler params tidak ditemukan di {path}, memakai batas default")
+            return cls(source='default')
+
+        try:
+            params = torch.load(path, map_location='cpu', weights_only=True)
+        except pickle.UnpicklingError:
+            # Format lama menyimpan ndarray numpy; izinkan hanya global numpy yang dibutuhkan
+            with torch.serialization.safe_globals(_NUMPY_GLOBALS):
+                params = torch.load(path, map_location='cpu', weights_only=True)
+
+        data_min = np.asarray(params['data_min'], dtype=np.float64)
+        data_max = np.asarray(params['data_max'], dtype=np.float64)
+        problem = cls._sanity_problem(data_min, data_max)
+        if problem is not None:
+            logger.warning(f"Scaler params di {path} diabaikan ({problem}), memakai batas default")
+            return cls(source='default')
+        return cls(data_min, data_max, params.get('n_samples_seen', 0), source=os.path.basename(path))
+
+    @staticmethod
+    def _sanity_problem(data_min, data_max):
+        if data_min.shape != (len(DEFAULT_DATA_MIN),) or data_max.shape != data_min.shape:
+            return f"bentuk {data_min.shape}/{data_max.shape}"
+        if not (np.isfinite(data_min).all() and np.isfinite(data_max).all()):
+            return "nilai tidak hingga"
+        if (data_max < data_min).any():
+            return "data_max < data_min"
+        # Jumlah ternak dan pendapatan mentah jauh di atas 1; batas di 0..1
+        # berarti parameter dihitung dari data yang sudah dinormalisasi
+        if data_max.max() <= 1.0:
+            return "batas 0..1, tampaknya dari data yang sudah dinormalisasi"
+        return None
+
+    def stats(self):
+        return {
+            'source': self.source,
+            'data_min': self.data_min.tolist(),
+            'data_max': self.data_max.tolist(),
+            'n_samples_seen': self.n_samples_seen
+        }
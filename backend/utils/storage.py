@@ -0,0 +1,461 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from urllib.request import pathname2url
+import pandas as pd
+from .forking import register_after_fork
+
+# Koneksi SQLite milik proses parent yang diwarisi child setelah fork.
+# Tidak boleh dipakai maupun ditutup di child, jadi cukup disimpan di sini.
+_INHERITED_CONNECTIONS = []
+
+# Naikkan penanda generation di tabel meta; dijalankan di dalam transaksi
+# yang menghapus atau menulis ulang baris (rewrite/merge)
+_BUMP_GENERATION = (
+    "INSERT INTO meta (key, value) VALUES ('generation', '1') "
+    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+)
+
+# Struktur kolom dataset ternak
+COLUMNS = [
+    'Tanggal',
+    'Ternak Besar Masuk',
+    'Ternak Kecil Masuk',
+    'Total Pendapatan'
+]
+
+
+def write_excel_atomic(df, path):
+    """
+    Tulis Excel ke file sementara di folder yang sama lalu os.replace,
+    sehingga pembaca tidak pernah melihat file yang setengah tertulis
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix='.xlsx', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            df.to_excel(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ExcelStorage:
+    def __init__(self, excel_path):
+        """
+        Storage backend lama: seluruh riwayat disimpan dalam satu file Excel.
+        Setiap append membaca dan menulis ulang seluruh workbook.
+
+        Args:
+            excel_path (str): Path to the Excel file containing livestock data
+        """
+        self.excel_path = excel_path
+
+    def create_empty(self):
+        """
+        Membuat file Excel kosong dengan struktur kolom yang benar
+        """
+        write_excel_atomic(pd.DataFrame(columns=COLUMNS), self.excel_path)
+
+    def load(self):
+        """
+        Load seluruh data dari file Excel
+        """
+        if not os.path.exists(self.excel_path):
+            print("File Excel tidak ditemukan. Membuat file baru...")
+            self.create_empty()
+        return pd.read_excel(self.excel_path)
+
+    def load_snapshot(self):
+        """
+        Lihat SQLiteStorage.load_snapshot. Excel tidak punya id baris maupun
+        generation, jadi sinkronisasi selalu berupa load penuh.
+        """
+        return self.load(), None, None
+
+    def entries_after(self, last_id, generation):
+        return None
+
+    def append(self, rows):
+        """
+        Tambahkan baris baru (list of dict) ke file Excel
+        """
+        new_entries = pd.DataFrame(rows, columns=COLUMNS)
+        if os.path.exists(self.excel_path):
+            existing_data = pd.read_excel(self.excel_path)
+            # Pastikan format data konsisten
+            existing_data['Tanggal'] = pd.to_datetime(existing_data['Tanggal']).dt.strftime('%Y-%m-%d')
+            existing_data['Total Pendapatan'] = existing_data['Total Pendapatan'].astype(float)
+        else:
+            existing_data = pd.DataFrame(columns=COLUMNS)
+
+        updated_data = pd.concat([existing_data, new_entries], ignore_index=True)
+        updated_data = updated_data.sort_values('Tanggal', kind='stable')
+        write_excel_atomic(updated_data, self.excel_path)
+
+    def rewrite(self, df):
+        """
+        Ganti seluruh isi file Excel dengan DataFrame yang diberikan
+        """
+        write_excel_atomic(df[COLUMNS], self.excel_path)
+
+    def merge(self, df, replace=False, chunk_size=5000, progress=None):
+        """
+        Gabungkan baris ter-normalisasi (lihat normalize_history) dengan satu
+        kali tulis ulang file. Lihat SQLiteStorage.merge.
+        """
+        existing = self.load()
+        existing_dates = pd.to_datetime(existing['Tanggal'], errors='coerce').dt.strftime('%Y-%m-%d')
+        overlap = df['Tanggal'].isin(set(existing_dates.dropna()))
+        if replace:
+            replaced_dates = set(df.loc[overlap, 'Tanggal'])
+            replaced = int(existing_dates.isin(replaced_dates).sum())
+            existing = existing[~existing_dates.isin(replaced_dates)]
+            new_rows, skipped = df, 0
+        else:
+            new_rows, skipped, replaced = df[~overlap], int(overlap.sum()), 0
+        updated = pd.concat([existing[COLUMNS], new_rows[COLUMNS]], ignore_index=True)
+        write_excel_atomic(updated.sort_values('Tanggal', kind='stable'), self.excel_path)
+        if progress is not None:
+            progress(len(new_rows), len(new_rows))
+        return {'inserted': len(new_rows), 'skipped': skipped, 'replaced': replaced}
+
+    def has_external_changes(self):
+        # Backend Excel hanya untuk satu proses
+        return False
+
+    def iter_snapshot(self, start=None, end=None, chunk_size=5000):
+        """
+        Lihat SQLiteStorage.iter_snapshot. Penanda (mtime dan ukuran) diambil
+        dari file handle yang sama dengan yang dibaca, jadi selalu cocok dengan
+        isinya walaupun file diganti bersamaan (os.replace). Workbook tetap
+        dibaca utuh karena format Excel tidak bisa dibaca sebagian.
+        """
+        if not os.path.exists(self.excel_path):
+            yield 'empty'
+            return
+        with open(self.excel_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            yield f"{stat.st_mtime_ns}-{stat.st_size}"
+            df = pd.read_excel(f)
+        dates = pd.to_datetime(df['Tanggal'], errors='coerce')
+        mask = dates.notna()
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        df = df.loc[mask, COLUMNS]
+        for offset in range(0, len(df), chunk_size):
+            yield df.iloc[offset:offset + chunk_size]
+
+
+class SQLiteStorage:
+    def __init__(self, db_path):
+        """
+        Storage backend append-only berbasis SQLite (mode WAL).
+        Setiap entri baru cukup satu INSERT, tanpa membaca ulang riwayat.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connect()
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tanggal TEXT NOT NULL,
+                ternak_besar REAL NOT NULL,
+                ternak_kecil REAL NOT NULL,
+                total_pendapatan REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_tanggal ON entries (tanggal);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._conn.commit()
+        self._data_version = self._read_data_version()
+        register_after_fork(self._after_fork)
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        # timeout: tunggu lock tulis dari proses worker lain
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # FULL: setiap commit di-fsync; biaya ditekan dengan group commit
+        self._conn.execute('PRAGMA synchronous=FULL')
+
+    def _after_fork(self):
+        _INHERITED_CONNECTIONS.append(self._conn)
+        self._connect()
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def has_external_changes(self):
+        """
+        True jika koneksi lain (misalnya worker Gunicorn lain) sudah commit
+        sejak pengecekan terakhir. Commit dari koneksi ini tidak dihitung.
+        """
+        with self._lock:
+            data_version = self._read_data_version()
+            changed = data_version != self._data_version
+            self._data_version = data_version
+            return changed
+
+    @staticmethod
+    def _to_records(rows):
+        return [
+            (
+                pd.to_datetime(row['Tanggal']).strftime('%Y-%m-%d'),
+                float(row['Ternak Besar Masuk']),
+                float(row['Ternak Kecil Masuk']),
+                float(row['Total Pendapatan'])
+            )
+            for row in rows
+        ]
+
+    def load(self):
+        """
+        Load seluruh data, terurut berdasarkan tanggal lalu urutan insert
+        """
+        with self._lock:
+            records = self._conn.execute(
+                'SELECT tanggal, ternak_besar, ternak_kecil, total_pendapatan '
+                'FROM entries ORDER BY tanggal, id'
+            ).fetchall()
+        return pd.DataFrame(records, columns=COLUMNS)
+
+    def _generation(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def load_snapshot(self):
+        """
+        Load seluruh data beserta penanda untuk sinkronisasi inkremental,
+        dibaca dalam satu transaksi baca (snapshot WAL yang sama)
+
+        Returns:
+            tuple: (DataFrame, generation, id terakhir)
+        """
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                generation = self._generation()
+                records = self._conn.execute(
+                    'SELECT id, tanggal, ternak_besar, ternak_kecil, total_pendapatan '
+                    'FROM entries ORDER BY tanggal, id'
+                ).fetchall()
+            finally:
+                self._conn.commit()
+        last_id = max((record[0] for record in records), default=0)
+        return pd.DataFrame([record[1:] for record in records], columns=COLUMNS), generation, last_id
+
+    def entries_after(self, last_id, generation):
+        """
+        Baris yang di-commit setelah id `last_id` (tabel append-only, id tidak
+        pernah dipakai ulang), terurut id
+
+        Args:
+            last_id (int): id terakhir yang sudah diterapkan pemanggil
+            generation (int): generation saat snapshot pemanggil dibuat
+
+        Returns:
+            list: (id, tanggal, ternak_besar, ternak_kecil, total_pendapatan), atau
+                None jika baris lama telah dihapus/ditulis ulang sejak snapshot
+                itu (rewrite/merge) sehingga pemanggil perlu load penuh
+        """
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                if self._generation() != generation:
+                    return None
+                return self._conn.execute(
+                    'SELECT id, tanggal, ternak_besar, ternak_kecil, total_pendapatan '
+                    'FROM entries WHERE id > ? ORDER BY id',
+                    (last_id,)
+                ).fetchall()
+            finally:
+                self._conn.commit()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def iter_snapshot(self, start=None, end=None, chunk_size=5000):
+        """
+        Generator export: item pertama adalah penanda isi tabel (untuk ETag),
+        berikutnya potongan DataFrame (urut tanggal lalu urutan insert),
+        difilter ke rentang tanggal [start, end].
+
+        Memakai koneksi read-only tersendiri: satu transaksi baca WAL memberi
+        snapshot yang konsisten selama export berjalan tanpa menahan lock
+        koneksi utama, dan memori tetap sebesar satu potongan. Penanda dibaca
+        di transaksi yang sama dengan barisnya; id AUTOINCREMENT tidak pernah
+        dipakai ulang, jadi setiap append maupun rewrite mengubah pasangan
+        (jumlah baris, id terakhir). Tutup generator (close) jika potongan
+        tidak dibaca sampai habis.
+
+        Args:
+            start (str): Tanggal awal 'YYYY-MM-DD' (inklusif) atau None
+            end (str): Tanggal akhir 'YYYY-MM-DD' (inklusif) atau None
+            chunk_size (int): Jumlah baris per potongan
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append('tanggal >= ?')
+            params.append(start)
+        if end is not None:
+            clauses.append('tanggal <= ?')
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ''
+
+        conn = sqlite3.connect(f'file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro', uri=True, check_same_thread=False, timeout=30)
+        try:
+            conn.execute('BEGIN')
+            count, last_id = conn.execute('SELECT COUNT(*), COALESCE(MAX(id), 0) FROM entries').fetchone()
+            yield f"{count}-{last_id}"
+            cursor = conn.execute(
+                'SELECT tanggal, ternak_besar, ternak_kecil, total_pendapatan '
+                f'FROM entries {where}ORDER BY tanggal, id',
+                params
+            )
+            while True:
+                records = cursor.fetchmany(chunk_size)
+                if not records:
+                    break
+                yield pd.DataFrame(records, columns=COLUMNS)
+        finally:
+            conn.close()
+
+    def append(self, rows):
+        """
+        Tambahkan baris baru (list of dict) dalam satu transaksi
+
+        Returns:
+            tuple: (id pertama, id terakhir) baris yang ditambahkan; id dalam
+                satu transaksi berurutan karena penulis SQLite diserialisasi
+        """
+        records = self._to_records(rows)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO entries (tanggal, ternak_besar, ternak_kecil, total_pendapatan) '
+                'VALUES (?, ?, ?, ?)',
+                records
+            )
+            last_id = self._conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        return last_id - len(records) + 1, last_id
+
+    def merge(self, df, replace=False, chunk_size=5000, progress=None):
+        """
+        Gabungkan baris ter-normalisasi (Tanggal 'YYYY-MM-DD', kolom numerik float,
+        satu baris per tanggal) ke tabel dalam satu transaksi.
+
+        Args:
+            df (pd.DataFrame): Data dengan kolom COLUMNS
+            replace (bool): True = hapus entri lama pada tanggal yang sama;
+                False = lewati baris yang tanggalnya sudah ada
+            chunk_size (int): Baris per executemany (untuk laporan progres)
+            progress (callable): progress(selesai, total) setelah setiap potongan
+
+        Returns:
+            dict: Jumlah baris inserted, skipped dan replaced (entri lama yang dihapus)
+        """
+        dates = df['Tanggal'].tolist()
+        records = list(zip(
+            dates,
+            df['Ternak Besar Masuk'].tolist(),
+            df['Ternak Kecil Masuk'].tolist(),
+            df['Total Pendapatan'].tolist()
+        ))
+        skipped = replaced = 0
+        with self._lock, self._conn:
+            self._conn.execute(_BUMP_GENERATION)
+            if records:
+                existing = {
+                    row[0] for row in self._conn.execute(
+                        'SELECT DISTINCT tanggal FROM entries WHERE tanggal BETWEEN ? AND ?',
+                        (min(dates), max(dates))
+                    )
+                }
+                overlap = existing.intersection(dates)
+                if overlap and replace:
+                    replaced = self._conn.executemany(
+                        'DELETE FROM entries WHERE tanggal = ?', [(d,) for d in overlap]
+                    ).rowcount
+                elif overlap:
+                    records = [record for record in records if record[0] not in overlap]
+                    skipped = len(dates) - len(records)
+
+            for offset in range(0, len(records), chunk_size):
+                self._conn.executemany(
+                    'INSERT INTO entries (tanggal, ternak_besar, ternak_kecil, total_pendapatan) '
+                    'VALUES (?, ?, ?, ?)',
+                    records[offset:offset + chunk_size]
+                )
+                if progress is not None:
+                    progress(min(offset + chunk_size, len(records)), len(records))
+        return {'inserted': len(records), 'skipped': skipped, 'replaced': replaced}
+
+    def rewrite(self, df):
+        """
+        Ganti seluruh isi tabel dengan DataFrame yang diberikan (satu transaksi)
+        """
+        records = self._to_records(df[COLUMNS].to_dict(orient='records'))
+        with self._lock, self._conn:
+            self._conn.execute(_BUMP_GENERATION)
+            self._conn.execute('DELETE FROM entries')
+            self._conn.executemany(
+                'INSERT INTO entries (tanggal, ternak_besar, ternak_kecil, total_pendapatan) '
+                'VALUES (?, ?, ?, ?)',
+                records
+            )
+
+    def import_excel(self, excel_path):
+        """
+        Import satu kali data lama dari file Excel.
+        Import dilewati jika sudah pernah dilakukan atau file tidak ada.
+
+        Returns:
+            int: Jumlah baris yang diimport
+        """
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'excel_imported'"
+            ).fetchone()
+        if done is not None or not os.path.exists(excel_path):
+            return 0
+
+        df = pd.read_excel(excel_path)
+        df['Tanggal'] = pd.to_datetime(df['Tanggal'], errors='coerce')
+        df = df.dropna(subset=['Tanggal'])
+        for col in COLUMNS[1:]:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df = df.sort_values('Tanggal', kind='stable')
+
+        records = self._to_records(df[COLUMNS].to_dict(orient='records'))
+        with self._lock, self._conn:
+            # Penanda dan data ditulis dalam satu transaksi; worker lain yang
+            # import bersamaan akan melihat penanda ini dan melewati import
+            marker = self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('excel_imported', ?)",
+                (os.path.basename(excel_path),)
+            )
+            if marker.rowcount == 0:
+                return 0
+            self._conn.executemany(
+                'INSERT INTO entries (tanggal, ternak_besar, ternak_kecil, total_pendapatan) '
+                'VALUES (?, ?, ?, ?)',
+                records
+            )
+        print(f"Import Excel selesai: {len(records)} baris")
+        return len(records)
@@ -0,0 +1,181 @@
+import copy
+import logging
+import time
+
+import numpy as np
+import torch
+from numpy.lib.stride_tricks import sliding_window_view
+from torch import nn
+from torch.utils.data import DataLoader, Dataset
+
+logger = logging.getLogger(__name__)
+
+# Rentang target dalam skala output model (lihat LSTMModelLoader._postprocess)
+RAW_TARGET_MIN = -1.0
+RAW_TARGET_MAX = 2.0
+
+
+def history_windows(values, window_size, horizon):
+    """
+    Window geser (window_size, fitur) dan target (horizon,) dari array riwayat.
+
+    Riwayat di-pad nol di depan seperti DataProcessor.get_sequence_data,
+    sehingga window ke-i berakhir di baris i dan targetnya adalah
+    Total Pendapatan baris i+1 .. i+horizon. Window dan target adalah view
+    stride_tricks atas array yang sama (tanpa salinan per window).
+
+    Args:
+        values (np.array): Riwayat (N, fitur), kolom terakhir = pendapatan
+        window_size (int): Panjang window input
+        horizon (int): Jumlah langkah target
+
+    Returns:
+        tuple: (windows (M, window_size, fitur), targets (M, horizon)), M = N - horizon
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    n_windows = len(values) - horizon
+    if n_windows <= 0:
+        raise ValueError(f"Butuh lebih dari {horizon} baris riwayat untuk training, ada {len(values)}")
+
+    padded = np.concatenate([np.zeros((window_size - 1, values.shape[1])), values])
+    windows = sliding_window_view(padded, window_size, axis=0).transpose(0, 2, 1)[:n_windows]
+    targets = sliding_window_view(padded[window_size:, -1], horizon)[:n_windows]
+    return windows, targets
+
+
+class WindowDataset(Dataset):
+    def __init__(self, windows, current_revenue, raw_targets, scale, offset):
+        """
+        Dataset training di atas view window; baris terakhir setiap window
+        diganti pendapatan saat ini seperti LSTMModelLoader._prepare_input
+        lalu dinormalisasi saat item diambil
+
+        Args:
+            windows (np.array): View (M, window_size, fitur) dari history_windows
+            current_revenue (np.array): Pendapatan saat ini per window (M,)
+            raw_targets (np.array): Target dalam skala output model (M, horizon)
+            scale (np.array): Konstanta scaler
+            offset (np.array): Konstanta scaler
+        """
+        self.windows = windows
+        self.current_revenue = current_revenue
+        self.raw_targets = raw_targets.astype(np.float32)
+        self.scale = scale
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.windows)
+
+    def __getitem__(self, index):
+        window = self.windows[index].copy()
+        window[-1, -1] = self.current_revenue[index]
+        model_input = (window * self.scale + self.offset).astype(np.float32)
+        return torch.from_numpy(model_input), torch.from_numpy(self.raw_targets[index])
+
+
+def build_dataset(loader, values, scaler=None):
+    """
+    Dataset training untuk model milik `loader` dari riwayat (N, 3).
+    Tanpa scaler, scaler model yang sedang dipakai.
+    """
+    scaler = scaler or loader.scaler
+    windows, targets = history_windows(values, loader.window_size, loader.config['output_size'])
+    last_rows = windows[:, -1, :]
+    current_revenue = last_rows[:, 0] * loader.harga_ternak_besar + last_rows[:, 1] * loader.harga_ternak_kecil
+    raw_targets = loader._inverse_postprocess(targets, current_revenue[:, np.newaxis])
+    # Di dekat target_harian penyebut invers hampir nol; batasi agar window
+    # tersebut tidak mendominasi loss
+    raw_targets = np.clip(raw_targets, RAW_TARGET_MIN, RAW_TARGET_MAX)
+    return WindowDataset(windows, current_revenue, raw_targets, scaler.scale, scaler.offset)
+
+
+def refit_scaler(loader, scaler, values):
+    """
+    Refit scaler dari riwayat (batas hanya melebar), ditambah pendapatan saat
+    ini yang dipakai di baris terakhir window.
+
+    Riwayat terurut tanggal, sehingga baris bertanggal lampau (bulk import,
+    tulisan worker lain) bisa berada di tengah array; karena itu seluruh
+    riwayat dipindai (satu lintasan min/max O(n)), bukan hanya ekor setelah
+    scaler.n_samples_seen.
+
+    Returns:
+        bool: True jika batas scaler berubah
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1, len(scaler.data_min))
+    current_rows = values.copy()
+    current_rows[:, -1] = values[:, 0] * loader.harga_ternak_besar + values[:, 1] * loader.harga_ternak_kecil
+    changed = scaler.partial_fit(values, count=False)
+    changed = scaler.partial_fit(current_rows, count=False) or changed
+    scaler.n_samples_seen = len(values)
+    return changed
+
+
+def _run_epoch(model, data_loader, criterion, optimizer=None):
+    total, count = 0.0, 0
+    for inputs, targets in data_loader:
+        if optimizer is not None:
+            optimizer.zero_grad()
+        loss = criterion(model(inputs), targets)
+        if optimizer is not None:
+            loss.backward()
+            nn.utils.clip_grad_norm_(model.parameters(), 1.0)
+            optimizer.step()
+        total += loss.item() * len(inputs)
+        count += len(inputs)
+    return total / count if count else float('nan')
+
+
+def train_model(model, dataset, epochs=20, batch_size=64, learning_rate=1e-3, val_fraction=0.1,
+                num_workers=2, seed=42):
+    """
+    Latih model (CPU) dan kembalikan state_dict dengan validation loss terbaik
+
+    Validasi memakai window paling akhir (urutan waktu), bukan acak.
+
+    Returns:
+        tuple: (state_dict, metrics dict)
+    """
+    torch.manual_seed(seed)
+    n_val = int(len(dataset) * val_fraction) if len(dataset) >= 10 else 0
+    train_indices = range(len(dataset) - n_val)
+    val_indices = range(len(dataset) - n_val, len(dataset))
+    train_set = torch.utils.data.Subset(dataset, train_indices)
+    val_set = torch.utils.data.Subset(dataset, val_indices)
+    if len(train_set) < 2:
+        raise ValueError("Riwayat terlalu sedikit untuk training (butuh minimal 2 window)")
+
+    # BatchNorm1d butuh lebih dari satu sample per batch saat training
+    drop_last = len(train_set) > batch_size and len(train_set) % batch_size == 1
+    train_loader = DataLoader(train_set, batch_size=batch_size, shuffle=True, drop_last=drop_last,
+                              num_workers=num_workers, persistent_workers=num_workers > 0)
+    val_loader = DataLoader(val_set, batch_size=batch_size * 4, num_workers=0)
+
+    criterion = nn.MSELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    best_state, best_loss = None, float('inf')
+    history = []
+    started = time.perf_counter()
+
+    for epoch in range(1, epochs + 1):
+        model.train()
+        train_loss = _run_epoch(model, train_loader, criterion, optimizer)
+        model.eval()
+        with torch.no_grad():
+            val_loss = _run_epoch(model, val_loader, criterion) if n_val else train_loss
+        history.append({'epoch': epoch, 'train_loss': train_loss, 'val_loss': val_loss})
+        logger.info(f"Epoch {epoch}/{epochs}: train_loss={train_loss:.6f} val_loss={val_loss:.6f}")
+        if val_loss < best_loss:
+            best_loss = val_loss
+            best_state = copy.deepcopy(model.state_dict())
+
+    model.eval()
+    metrics = {
+        'windows': len(dataset),
+        'train_windows': len(train_set),
+        'val_windows': n_val,
+        'best_val_loss': best_loss,
+        'epochs': history,
+        'seconds': time.perf_counter() - started
+    }
+    return best_state, metrics
@@ -47,68 +47,12 @@ document.addEventListener('DOMContentLoaded', () => {
             }
 
             if (data.status === 'success') {
-                // Fungsi helper untuk mendapatkan arrow dan warna
-                const getArrowAndColor = (value) => {
-                    if (value >= 0) {
-                        return {
-                            arrow: '↑',
-                            color: 'text-green-600'
-                        };
-                    } else {
-                        return {
-                            arrow: '↓',
-                            color: 'text-red-600'
-                        };
-                    }
-                };
-
-                const predictionHtml = `
-                    <div class="bg-green-100 text-green-800 p-4 rounded-md">
-                        <h3 class="font-bold mb-2">Prediksi Pendapatan</h3>
-                        
-                        <!-- Tambahkan Target Harian -->
-                        <p class="mb-2">
-                            Target Harian: <span class="font-bold">Rp ${data.target_harian.toLocaleString('id-ID')}</span>
-                        </p>
-                        
-                        <!-- Rata-rata Prediksi dan Defisit -->
-                        <p class="flex items-center gap-2 mb-2">
-                            Rata-rata Prediksi: 
-                            <span class="${getArrowAndColor(data.avg_prediction).color} font-bold">
-                                ${getArrowAndColor(data.avg_prediction).arrow} Rp ${Math.abs(data.avg_prediction).toLocaleString('id-ID')}
-                            </span>
-                        </p>
-                        <p class="mb-4">
-                            Status: <span class="font-bold ${data.avg_deficit > 0 ? 'text-red-600' : 'text-green-600'}">
-                                ${data.avg_deficit > 0 ? 'KURANG' : 'TERCAPAI'} 
-                                (${data.avg_deficit > 0 ? '-' : '+'} Rp ${Math.abs(data.avg_deficit).toLocaleString('id-ID')})
-                            </span>
-                        </p>
+                renderPrediction(data);
 
-                        <!-- Prediksi per minggu -->
-                        <h4 class="mt-4 font-semibold">Prediksi 4 Minggu Kedepan:</h4>
-                        <div class="grid grid-cols-1 gap-2 mt-2">
-                            ${data.predictions.map((pred, index) => `
-                                <div class="flex items-center justify-between border-b py-2">
-                                    <span>${pred.hari}, ${pred.tanggal}</span>
-                                    <div class="text-right">
-                                        <span class="${pred.defisit > 0 ? 'text-red-600' : 'text-green-600'} font-bold">
-                                            Rp ${Math.abs(pred.nilai).toLocaleString('id-ID')}
-                                        </span>
-                                        <br>
-                                        <span class="text-sm ${pred.defisit > 0 ? 'text-red-500' : 'text-green-500'}">
-                                            ${pred.status} ${pred.defisit_rupiah}
-                                        </span>
-                                    </div>
-                                </div>
-                            `).join('')}
-                        </div>
-                    </div>
-                `;
-                predictionResults.innerHTML = predictionHtml;
-                
-                // Refresh grafik setelah prediksi berhasil
-                setTimeout(fetchRevenueHistory, 1000);
+                // Tanpa SSE (atau stream sedang tertutup), grafik di-refresh manual setelah prediksi
+                if (!streamOpen) {
+                    setTimeout(fetchRevenueHistory, 1000);
+                }
             } else {
                 throw new Error(data.message || 'Prediksi gagal');
             }
@@ -122,6 +66,70 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // Tampilkan hasil prediksi (dari response /predict atau event 'forecast' /stream,
+    // yang hanya dikirim untuk prediksi yang disimpan)
+    function renderPrediction(data) {
+        // Fungsi helper untuk mendapatkan arrow dan warna
+        const getArrowAndColor = (value) => {
+            if (value >= 0) {
+                return {
+                    arrow: '↑',
+                    color: 'text-green-600'
+                };
+            } else {
+                return {
+                    arrow: '↓',
+                    color: 'text-red-600'
+                };
+            }
+        };
+
+        const predictionHtml = `
+            <div class="bg-green-100 text-green-800 p-4 rounded-md">
+                <h3 class="font-bold mb-2">Prediksi Pendapatan</h3>
+                
+                <!-- Tambahkan Target Harian -->
+                <p class="mb-2">
+                    Target Harian: <span class="font-bold">Rp ${data.target_harian.toLocaleString('id-ID')}</span>
+                </p>
+                
+                <!-- Rata-rata Prediksi dan Defisit -->
+                <p class="flex items-center gap-2 mb-2">
+                    Rata-rata Prediksi: 
+                    <span class="${getArrowAndColor(data.avg_prediction).color} font-bold">
+                        ${getArrowAndColor(data.avg_prediction).arrow} Rp ${Math.abs(data.avg_prediction).toLocaleString('id-ID')}
+                    </span>
+                </p>
+                <p class="mb-4">
+                    Status: <span class="font-bold ${data.avg_deficit > 0 ? 'text-red-600' : 'text-green-600'}">
+                        ${data.avg_deficit > 0 ? 'KURANG' : 'TERCAPAI'} 
+                        (${data.avg_deficit > 0 ? '-' : '+'} Rp ${Math.abs(data.avg_deficit).toLocaleString('id-ID')})
+                    </span>
+                </p>
+
+                <!-- Prediksi per minggu -->
+                <h4 class="mt-4 font-semibold">Prediksi 4 Minggu Kedepan:</h4>
+                <div class="grid grid-cols-1 gap-2 mt-2">
+                    ${data.predictions.map((pred, index) => `
+                        <div class="flex items-center justify-between border-b py-2">
+                            <span>${pred.hari}, ${pred.tanggal}</span>
+                            <div class="text-right">
+                                <span class="${pred.defisit > 0 ? 'text-red-600' : 'text-green-600'} font-bold">
+                                    Rp ${Math.abs(pred.nilai).toLocaleString('id-ID')}
+                                </span>
+                                <br>
+                                <span class="text-sm ${pred.defisit > 0 ? 'text-red-500' : 'text-green-500'}">
+                                    ${pred.status} ${pred.defisit_rupiah}
+                                </span>
+                            </div>
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        `;
+        predictionResults.innerHTML = predictionHtml;
+    }
+
     // Fetch revenue history
     async function fetchRevenueHistory() {
         try {
@@ -134,15 +142,111 @@ document.addEventListener('DOMContentLoaded', () => {
             console.log('Revenue history:', data); // Debug log
 
             if (data.status === 'success') {
-                renderRevenueChart(data.history);
+                revenueHistory = data.history;
+                renderRevenueChart(revenueHistory);
             }
         } catch (error) {
             console.error('Error fetching history:', error);
         }
     }
 
+    // Riwayat yang sedang ditampilkan (30 hari terakhir, sama dengan /revenue_history)
+    let revenueHistory = [];
+    const HISTORY_DAYS = 30;
+
+    // Tambahkan baris riwayat baru dari /stream tanpa mengambil ulang semua data
+    function applyHistoryRows(rows) {
+        const cutoff = new Date();
+        cutoff.setHours(0, 0, 0, 0);
+        cutoff.setDate(cutoff.getDate() - HISTORY_DAYS + 1);
+        const chart = window.revenueChartInstance;
+        const wasEmpty = revenueHistory.length === 0;
+
+        revenueHistory = revenueHistory.concat(rows);
+        let expired = 0;
+        while (expired < revenueHistory.length && new Date(revenueHistory[expired].Tanggal) < cutoff) {
+            expired++;
+        }
+        revenueHistory = revenueHistory.slice(expired);
+
+        if (!chart || wasEmpty) {
+            // Grafik masih placeholder "Belum ada data": bangun ulang
+            renderRevenueChart(revenueHistory);
+            return;
+        }
+        chart.data.labels.splice(0, expired);
+        chart.data.datasets[0].data.splice(0, expired);
+        rows.forEach(entry => {
+            chart.data.labels.push(new Date(entry.Tanggal).toLocaleDateString('id-ID'));
+            chart.data.datasets[0].data.push(parseFloat(entry.Total_Pendapatan));
+        });
+        chart.update('none');
+    }
+
+    // Status /stream: selama tertutup, riwayat diambil dengan polling
+    const STREAM_RETRY_MIN_MS = 3000;
+    const STREAM_RETRY_MAX_MS = 60000;
+    const POLL_INTERVAL_MS = 30000;
+    let streamOpen = false;
+    let streamRetryMs = STREAM_RETRY_MIN_MS;
+    let pollTimer = null;
+
+    function startPolling() {
+        if (pollTimer === null) {
+            pollTimer = setInterval(fetchRevenueHistory, POLL_INTERVAL_MS);
+        }
+    }
+
+    function stopPolling() {
+        if (pollTimer !== null) {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+    }
+
+    // Push perubahan dari server (Server-Sent Events) menggantikan polling
+    function connectStream() {
+        const source = new EventSource('/stream');
+        source.onopen = () => {
+            if (pollTimer !== null) {
+                // Tersambung lagi setelah tertutup: event selama itu tidak terkirim
+                fetchRevenueHistory();
+            }
+            streamOpen = true;
+            streamRetryMs = STREAM_RETRY_MIN_MS;
+            stopPolling();
+        };
+        source.addEventListener('history', (event) => {
+            applyHistoryRows(JSON.parse(event.data).rows);
+        });
+        source.addEventListener('forecast', (event) => {
+            renderPrediction(JSON.parse(event.data));
+        });
+        source.addEventListener('reset', () => {
+            fetchRevenueHistory();
+        });
+        source.onerror = () => {
+            streamOpen = false;
+            if (source.readyState !== EventSource.CLOSED) {
+                // EventSource tersambung ulang otomatis (dengan Last-Event-ID)
+                console.log('Stream terputus, menyambung ulang...');
+                return;
+            }
+            // Response non-200 (mis. 503 karena STREAM_MAX_CLIENTS penuh) menutup
+            // EventSource permanen: polling dulu lalu coba lagi dengan backoff
+            console.log(`Stream ditutup, polling riwayat dan mencoba lagi dalam ${streamRetryMs / 1000} detik`);
+            source.close();
+            startPolling();
+            setTimeout(connectStream, streamRetryMs);
+            streamRetryMs = Math.min(streamRetryMs * 2, STREAM_RETRY_MAX_MS);
+        };
+    }
+
     // Initial load
     fetchRevenueHistory();
+    if (window.EventSource) {
+        connectStream();
+    }
 
     // Tambahkan fungsi ini sebelum fetchRevenueHistory
     function renderRevenueChart(history) {